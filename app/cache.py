@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import (
+    ACCESS_ACTOR_CACHE_MAX_SIZE,
+    ACCESS_ACTOR_CACHE_TTL_SECONDS,
+    ACCESS_READ_YOUR_WRITES_SECONDS,
+)
+from app.models import AccessUser
+
+
+@dataclass(frozen=True)
+class CachedActor:
+    clerk_user_id: str
+    email: Optional[str]
+    full_name: Optional[str]
+    status: str
+    requested_role: str
+    approved_role: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: AccessUser) -> CachedActor:
+        return cls(
+            clerk_user_id=user.clerk_user_id,
+            email=user.email,
+            full_name=user.full_name,
+            status=user.status,
+            requested_role=user.requested_role,
+            approved_role=user.approved_role,
+        )
+
+
+class ActorCache:
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, CachedActor]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def lookup(self, clerk_user_id: str) -> tuple[Optional[CachedActor], int]:
+        if not self.enabled:
+            return None, self._generation
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(clerk_user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(clerk_user_id)
+                self.hits += 1
+                return entry[1], self._generation
+            if entry is not None:
+                del self._entries[clerk_user_id]
+            self.misses += 1
+            return None, self._generation
+
+    def store(self, clerk_user_id: str, actor: CachedActor, generation: int) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            # An invalidation ran while the caller was loading: the row it read may already be stale.
+            if generation != self._generation:
+                return
+            self._entries[clerk_user_id] = (time.monotonic() + self.ttl_seconds, actor)
+            self._entries.move_to_end(clerk_user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, clerk_user_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(clerk_user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+actor_cache = ActorCache(
+    max_size=ACCESS_ACTOR_CACHE_MAX_SIZE,
+    ttl_seconds=ACCESS_ACTOR_CACHE_TTL_SECONDS,
+)
+
+
+class AdminCountCache:
+    def __init__(self) -> None:
+        self._count: Optional[int] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, version: int) -> Optional[int]:
+        with self._lock:
+            return self._count if self._version == version else None
+
+    def store(self, count: int, version: int) -> None:
+        with self._lock:
+            self._count = count
+            self._version = version
+
+    def apply(self, delta: int, version: int) -> None:
+        with self._lock:
+            # Only move forward from the version just before ours; otherwise another worker changed the set too.
+            if self._count is not None and self._version == version - 1:
+                self._count += delta
+                self._version = version
+            else:
+                self._count = None
+                self._version = None
+
+
+admin_count_cache = AdminCountCache()
+
+
+class RecentWriters:
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self._deadlines: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, clerk_user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._deadlines[clerk_user_id] = now + self.window_seconds
+            self._deadlines.move_to_end(clerk_user_id)
+            # Deadlines are appended in time order, so expired entries sit at the front.
+            while self._deadlines:
+                oldest_id, deadline = next(iter(self._deadlines.items()))
+                if deadline > now:
+                    break
+                self._deadlines.pop(oldest_id)
+
+    def wrote_recently(self, clerk_user_id: str) -> bool:
+        with self._lock:
+            deadline = self._deadlines.get(clerk_user_id)
+        return deadline is not None and deadline > time.monotonic()
+
+
+recent_writers = RecentWriters(window_seconds=ACCESS_READ_YOUR_WRITES_SECONDS)
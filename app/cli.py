@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+from typing import Optional
+
+from app.db import SessionLocal, engine
+from app.migrations import LATEST_SCHEMA_VERSION, MIGRATIONS, check_schema_version, current_schema_version, migrate
+from app.services.unread_counter import recount_unread_counters
+
+
+def _migrate(args: argparse.Namespace) -> None:
+    applied = migrate(engine, target=args.target)
+    for migration in applied:
+        print(f"Applied migration {migration.version}: {migration.description}")
+    if not applied:
+        print("Schema already up to date")
+
+
+def _schema_version(args: argparse.Namespace) -> None:
+    with engine.connect() as connection:
+        version = current_schema_version(connection)
+    print(f"Schema version {version} (latest {LATEST_SCHEMA_VERSION})")
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            print(f"Pending migration {migration.version}: {migration.description}")
+
+
+def _recount_unread(args: argparse.Namespace) -> None:
+    with engine.connect() as connection:
+        check_schema_version(connection)
+    db = SessionLocal()
+    try:
+        updated = recount_unread_counters(db, clerk_user_id=args.user)
+    finally:
+        db.close()
+    print(f"Recounted unread messages for {updated} user(s)")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Access backend maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_command = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_command.add_argument("--target", type=int, default=None, help="Stop after this schema version")
+    migrate_command.set_defaults(handler=_migrate)
+
+    version = commands.add_parser("schema-version", help="Show the applied and pending schema migrations")
+    version.set_defaults(handler=_schema_version)
+
+    recount = commands.add_parser("recount-unread", help="Rebuild per-user unread message counters")
+    recount.add_argument("--user", default=None, help="Only recount this clerk user id")
+    recount.set_defaults(handler=_recount_unread)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
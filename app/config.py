@@ -7,6 +7,17 @@ DATABASE_URL = os.getenv("ACCESS_DATABASE_URL", "sqlite:///./access.db")
 ACCESS_BACKEND_API_KEY = os.getenv("ACCESS_BACKEND_API_KEY", "dev-local-access-key")
 
 
+def _to_async_database_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    if "+" in scheme:
+        return url
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite{separator}{rest}"
+    if scheme in {"postgres", "postgresql"}:
+        return f"postgresql+asyncpg{separator}{rest}"
+    return url
+
+
 def _parse_csv_env(name: str, default: str) -> list[str]:
     return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
 
@@ -21,3 +32,41 @@ def _parse_bool_env(name: str, default: bool) -> bool:
 ACCESS_ALLOWED_ORIGINS = _parse_csv_env("ACCESS_ALLOWED_ORIGINS", "*")
 ACCESS_ALLOWED_ORIGIN_REGEX = os.getenv("ACCESS_ALLOWED_ORIGIN_REGEX")
 ACCESS_CORS_ALLOW_CREDENTIALS = _parse_bool_env("ACCESS_CORS_ALLOW_CREDENTIALS", True)
+
+ACCESS_ACTOR_CACHE_MAX_SIZE = int(os.getenv("ACCESS_ACTOR_CACHE_MAX_SIZE", "10000"))
+ACCESS_ACTOR_CACHE_TTL_SECONDS = float(os.getenv("ACCESS_ACTOR_CACHE_TTL_SECONDS", "30"))
+
+ACCESS_STREAM_KEEPALIVE_SECONDS = float(os.getenv("ACCESS_STREAM_KEEPALIVE_SECONDS", "15"))
+ACCESS_STREAM_QUEUE_SIZE = int(os.getenv("ACCESS_STREAM_QUEUE_SIZE", "100"))
+
+ACCESS_DB_ASYNC = _parse_bool_env("ACCESS_DB_ASYNC", False)
+ASYNC_DATABASE_URL = os.getenv("ACCESS_ASYNC_DATABASE_URL", _to_async_database_url(DATABASE_URL))
+
+ACCESS_DB_PROFILE = os.getenv("ACCESS_DB_PROFILE", "tuned").strip().lower()
+ACCESS_DB_POOL_SIZE = int(os.getenv("ACCESS_DB_POOL_SIZE", "10"))
+ACCESS_DB_MAX_OVERFLOW = int(os.getenv("ACCESS_DB_MAX_OVERFLOW", "20"))
+ACCESS_DB_POOL_TIMEOUT = float(os.getenv("ACCESS_DB_POOL_TIMEOUT", "30"))
+ACCESS_DB_POOL_RECYCLE = int(os.getenv("ACCESS_DB_POOL_RECYCLE", "1800"))
+ACCESS_DB_POOL_PRE_PING = _parse_bool_env("ACCESS_DB_POOL_PRE_PING", True)
+ACCESS_SQLITE_JOURNAL_MODE = os.getenv("ACCESS_SQLITE_JOURNAL_MODE", "WAL")
+ACCESS_SQLITE_SYNCHRONOUS = os.getenv("ACCESS_SQLITE_SYNCHRONOUS", "NORMAL")
+ACCESS_SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("ACCESS_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+ACCESS_SQLITE_MMAP_SIZE = int(os.getenv("ACCESS_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+ACCESS_SQLITE_CACHE_SIZE = int(os.getenv("ACCESS_SQLITE_CACHE_SIZE", "-64000"))
+ACCESS_METRICS_ENABLED = _parse_bool_env("ACCESS_METRICS_ENABLED", True)
+ACCESS_PROFILING_ENABLED = _parse_bool_env("ACCESS_PROFILING_ENABLED", False)
+ACCESS_PROFILING_SLOW_QUERY_MS = float(os.getenv("ACCESS_PROFILING_SLOW_QUERY_MS", "100"))
+ACCESS_PROFILING_N_PLUS_ONE_THRESHOLD = int(os.getenv("ACCESS_PROFILING_N_PLUS_ONE_THRESHOLD", "3"))
+ACCESS_AUTO_MIGRATE = _parse_bool_env("ACCESS_AUTO_MIGRATE", False)
+ACCESS_READ_REPLICA_URL = os.getenv("ACCESS_READ_REPLICA_URL", "").strip() or None
+ASYNC_READ_REPLICA_URL = os.getenv("ACCESS_ASYNC_READ_REPLICA_URL") or (
+    _to_async_database_url(ACCESS_READ_REPLICA_URL) if ACCESS_READ_REPLICA_URL else None
+)
+ACCESS_READ_YOUR_WRITES_SECONDS = float(os.getenv("ACCESS_READ_YOUR_WRITES_SECONDS", "5"))
+ACCESS_READ_RECEIPT_BUFFER_ENABLED = _parse_bool_env("ACCESS_READ_RECEIPT_BUFFER_ENABLED", False)
+ACCESS_READ_RECEIPT_FLUSH_SECONDS = float(os.getenv("ACCESS_READ_RECEIPT_FLUSH_SECONDS", "1"))
+ACCESS_READ_RECEIPT_FLUSH_SIZE = int(os.getenv("ACCESS_READ_RECEIPT_FLUSH_SIZE", "500"))
+ACCESS_DELETION_WORKER_ENABLED = _parse_bool_env("ACCESS_DELETION_WORKER_ENABLED", True)
+ACCESS_DELETION_BATCH_SIZE = int(os.getenv("ACCESS_DELETION_BATCH_SIZE", "1000"))
+ACCESS_DELETION_BATCH_PAUSE_SECONDS = float(os.getenv("ACCESS_DELETION_BATCH_PAUSE_SECONDS", "0.05"))
+ACCESS_DELETION_POLL_SECONDS = float(os.getenv("ACCESS_DELETION_POLL_SECONDS", "5"))
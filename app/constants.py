@@ -17,6 +17,27 @@ class AccessStatus(str, Enum):
     rejected = "rejected"
 
 
+class BulkActionOutcome(str, Enum):
+    approved = "approved"
+    rejected = "rejected"
+    already_approved = "already_approved"
+    already_rejected = "already_rejected"
+    not_found = "not_found"
+    synced = "synced"
+    pending_deletion = "pending_deletion"
+
+
+class UserDeletionMode(str, Enum):
+    immediate = "immediate"
+    background = "background"
+
+
+class DeletionJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+
+
 PERMISSIONS_BY_ROLE: dict[AccessRole, list[str]] = {
     AccessRole.viewer: ["dashboard:read", "pnl:global:read"],
     AccessRole.editor: [
@@ -47,6 +68,28 @@ PERMISSIONS_BY_ROLE: dict[AccessRole, list[str]] = {
 }
 
 
+PERMISSION_SETS_BY_ROLE: dict[AccessRole, frozenset[str]] = {
+    role: frozenset(permissions) for role, permissions in PERMISSIONS_BY_ROLE.items()
+}
+
+
+SYNC_BATCH_MAX_ITEMS = 1000
+SYNC_BATCH_MAX_ATTEMPTS = 3
+ADMIN_BULK_MAX_ITEMS = 1000
+PERMISSION_CHECK_MAX_ITEMS = 1000
+
+MESSAGES_PAGE_DEFAULT_LIMIT = 50
+MESSAGES_PAGE_MAX_LIMIT = 200
+MESSAGES_SEARCH_MAX_QUERY_LENGTH = 200
+MESSAGE_PREVIEW_LENGTH = 160
+BROADCAST_MAX_RECIPIENTS = 10000
+READ_BATCH_MAX_ITEMS = 1000
+
+EXPORT_CHUNK_SIZE = 500
+
+DELETION_JOB_STALE_SECONDS = 60
+
+
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -1,16 +1,172 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import time
+from collections.abc import Callable
+from typing import Any, Optional
 
-from app.config import DATABASE_URL
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import Pool
 
+from app.config import (
+    ACCESS_DB_ASYNC,
+    ACCESS_DB_MAX_OVERFLOW,
+    ACCESS_DB_POOL_PRE_PING,
+    ACCESS_DB_POOL_RECYCLE,
+    ACCESS_DB_POOL_SIZE,
+    ACCESS_DB_POOL_TIMEOUT,
+    ACCESS_DB_PROFILE,
+    ACCESS_READ_REPLICA_URL,
+    ACCESS_SQLITE_BUSY_TIMEOUT_MS,
+    ACCESS_SQLITE_CACHE_SIZE,
+    ACCESS_SQLITE_JOURNAL_MODE,
+    ACCESS_SQLITE_MMAP_SIZE,
+    ACCESS_SQLITE_SYNCHRONOUS,
+    ASYNC_DATABASE_URL,
+    ASYNC_READ_REPLICA_URL,
+    DATABASE_URL,
+)
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _engine_options(url: str) -> dict[str, Any]:
+    if _is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}}
+    if ACCESS_DB_PROFILE != "tuned":
+        return {}
+    return {
+        "pool_size": ACCESS_DB_POOL_SIZE,
+        "max_overflow": ACCESS_DB_MAX_OVERFLOW,
+        "pool_timeout": ACCESS_DB_POOL_TIMEOUT,
+        "pool_recycle": ACCESS_DB_POOL_RECYCLE,
+        "pool_pre_ping": ACCESS_DB_POOL_PRE_PING,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, _: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={ACCESS_SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={ACCESS_SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={ACCESS_SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={ACCESS_SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={ACCESS_SQLITE_CACHE_SIZE}")
+    finally:
+        cursor.close()
+
+
+def _configure(sync_engine: Engine) -> Engine:
+    if ACCESS_DB_PROFILE == "tuned" and sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    return sync_engine
+
+
+QueryObserver = Callable[[str, float], None]
+_query_observers: list[QueryObserver] = []
+
+
+def _start_query_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any) -> None:
+    # Kept on the execution context, which is discarded when the statement fails.
+    if context is not None:
+        context.query_started_at = time.perf_counter()
+
+
+def _stop_query_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any) -> None:
+    started_at = getattr(context, "query_started_at", None)
+    if started_at is None:
+        return
+    seconds = time.perf_counter() - started_at
+    for observer in _query_observers:
+        observer(statement, seconds)
+
+
+def observe_queries(sync_engine: Engine, observer: QueryObserver) -> None:
+    if observer not in _query_observers:
+        _query_observers.append(observer)
+    if not event.contains(sync_engine, "before_cursor_execute", _start_query_timer):
+        event.listen(sync_engine, "before_cursor_execute", _start_query_timer)
+        event.listen(sync_engine, "after_cursor_execute", _stop_query_timer)
+
+
+def _create_sync_engine(url: str) -> Engine:
+    return _configure(create_engine(url, **_engine_options(url)))
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    async_engine = create_async_engine(url, **_engine_options(url))
+    _configure(async_engine.sync_engine)
+    return async_engine
+
+
+engine = _create_sync_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+if ACCESS_DB_ASYNC:
+    async_engine = _create_async_engine(ASYNC_DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+read_engine: Optional[Engine] = None
+ReadSessionLocal: Optional[sessionmaker[Session]] = None
+async_read_engine: Optional[AsyncEngine] = None
+AsyncReadSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+if ACCESS_READ_REPLICA_URL:
+    read_engine = _create_sync_engine(ACCESS_READ_REPLICA_URL)
+    ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False, expire_on_commit=False)
+    if ACCESS_DB_ASYNC and ASYNC_READ_REPLICA_URL:
+        async_read_engine = _create_async_engine(ASYNC_READ_REPLICA_URL)
+        AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+def sync_engines() -> list[Engine]:
+    engines = [engine]
+    for candidate in (async_engine, read_engine, async_read_engine):
+        if candidate is not None:
+            engines.append(candidate if isinstance(candidate, Engine) else candidate.sync_engine)
+    return engines
+
+
+def _pool_stats(pool: Pool) -> dict[str, Any]:
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    return stats
+
+
+def pool_stats() -> dict[str, dict[str, Any]]:
+    stats = {"sync": _pool_stats(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = _pool_stats(async_engine.pool)
+    if read_engine is not None:
+        stats["read_sync"] = _pool_stats(read_engine.pool)
+    if async_read_engine is not None:
+        stats["read_async"] = _pool_stats(async_read_engine.pool)
+    return stats
+
+
+def upsert(db: Session, target: Any) -> Any:
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(target)
+    return sqlite.insert(target)
+
+
+def as_stored(db: Session, column: Any, value: Any) -> Any:
+    # Round-trip through the column type so the value matches what a read returns (naive on SQLite).
+    dialect = db.get_bind().dialect
+    column_type = column.type.dialect_impl(dialect)
+    for processor in (column_type.bind_processor(dialect), column_type.result_processor(dialect, None)):
+        if processor is not None and value is not None:
+            value = processor(value)
+    return value
+
 
 class Base(DeclarativeBase):
     pass
-
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
-from typing import Optional
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager
+from typing import Optional, TypeVar, Union
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.config import ACCESS_BACKEND_API_KEY
+from app.cache import CachedActor, actor_cache, recent_writers
+from app.config import ACCESS_BACKEND_API_KEY, ACCESS_DB_ASYNC
 from app.constants import AccessRole, AccessStatus
-from app.db import SessionLocal
+from app.db import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal
 from app.models import AccessUser
 
 
-def get_db() -> Session:
+T = TypeVar("T")
+DbSession = Union[Session, AsyncSession]
+
+
+def get_db() -> Iterator[Session]:
     db = SessionLocal()
     try:
         yield db
@@ -20,30 +29,124 @@ def get_db() -> Session:
         db.close()
 
 
-def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="x-api-key")) -> None:
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_session = get_async_db if ACCESS_DB_ASYNC else get_db
+
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[DbSession]:
+    # For long-lived responses: dependency sessions stay open until the response ends.
+    if ACCESS_DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _reads_from_primary(clerk_user_id: Optional[str]) -> bool:
+    return clerk_user_id is not None and recent_writers.wrote_recently(clerk_user_id)
+
+
+def get_read_db(
+    x_actor_clerk_user_id: Optional[str] = Header(default=None, alias="x-actor-clerk-user-id"),
+) -> Iterator[Session]:
+    factory = ReadSessionLocal
+    if factory is None or _reads_from_primary(x_actor_clerk_user_id):
+        factory = SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(
+    x_actor_clerk_user_id: Optional[str] = Header(default=None, alias="x-actor-clerk-user-id"),
+) -> AsyncIterator[AsyncSession]:
+    factory = AsyncReadSessionLocal
+    if factory is None or _reads_from_primary(x_actor_clerk_user_id):
+        factory = AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+get_read_session = get_async_read_db if ACCESS_DB_ASYNC else get_read_db
+
+
+async def record_actor_write(
+    request: Request,
+    x_actor_clerk_user_id: Optional[str] = Header(default=None, alias="x-actor-clerk-user-id"),
+) -> None:
+    if ReadSessionLocal is not None and x_actor_clerk_user_id and request.method not in SAFE_METHODS:
+        recent_writers.record(x_actor_clerk_user_id)
+
+
+async def run_db(db: DbSession, service: Callable[..., T], *args: object, **kwargs: object) -> T:
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: service(*args, db=session, **kwargs))
+    return await run_in_threadpool(service, *args, db=db, **kwargs)
+
+
+async def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="x-api-key")) -> None:
     if x_api_key != ACCESS_BACKEND_API_KEY:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
 
 
-def require_approved_user(
-    db: Session = Depends(get_db),
+def _load_approved_actor(clerk_user_id: str, db: Session) -> Optional[CachedActor]:
+    user = db.scalar(select(AccessUser).where(AccessUser.clerk_user_id == clerk_user_id))
+    actor = CachedActor.from_user(user) if user is not None and user.status == AccessStatus.approved.value else None
+    # Hand the connection back before the route opens its own (possibly read) session.
+    db.rollback()
+    return actor
+
+
+async def require_approved_user(
+    db: DbSession = Depends(get_session),
     x_actor_clerk_user_id: Optional[str] = Header(default=None, alias="x-actor-clerk-user-id"),
 ) -> AccessUser:
     if not x_actor_clerk_user_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing actor id")
 
-    actor = db.scalar(select(AccessUser).where(AccessUser.clerk_user_id == x_actor_clerk_user_id))
-    if actor is None or actor.status != AccessStatus.approved.value:
+    actor, generation = actor_cache.lookup(x_actor_clerk_user_id)
+    if actor is None:
+        actor = await run_db(db, _load_approved_actor, x_actor_clerk_user_id)
+        if actor is not None:
+            actor_cache.store(x_actor_clerk_user_id, actor, generation)
+    if actor is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only approved users can perform this action")
 
-    return actor
+    return AccessUser(
+        clerk_user_id=actor.clerk_user_id,
+        email=actor.email,
+        full_name=actor.full_name,
+        status=actor.status,
+        requested_role=actor.requested_role,
+        approved_role=actor.approved_role,
+    )
+
+
+async def require_approved_stream_user(
+    x_actor_clerk_user_id: Optional[str] = Header(default=None, alias="x-actor-clerk-user-id"),
+) -> AccessUser:
+    async with open_session() as db:
+        return await require_approved_user(db=db, x_actor_clerk_user_id=x_actor_clerk_user_id)
 
 
-def require_approved_admin(
-    db: Session = Depends(get_db),
+async def require_approved_admin(
+    db: DbSession = Depends(get_session),
     x_actor_clerk_user_id: Optional[str] = Header(default=None, alias="x-actor-clerk-user-id"),
 ) -> AccessUser:
-    actor = require_approved_user(db=db, x_actor_clerk_user_id=x_actor_clerk_user_id)
+    actor = await require_approved_user(db=db, x_actor_clerk_user_id=x_actor_clerk_user_id)
     if actor.approved_role != AccessRole.admin.value:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only approved admins can perform this action")
 
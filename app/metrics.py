@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+import anyio.to_thread
+from sqlalchemy import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db import observe_queries, pool_stats
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class Histogram:
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+_current_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("current_db_stats", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.db_queries: dict[tuple[str, str], int] = {}
+        self.db_seconds: dict[tuple[str, str], float] = {}
+
+    def record(self, method: str, route: str, status_code: int, seconds: float, db_stats: RequestDbStats) -> None:
+        key = (method, route)
+        request_key = (method, route, status_code)
+        self.requests[request_key] = self.requests.get(request_key, 0) + 1
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        self.db_queries[key] = self.db_queries.get(key, 0) + db_stats.queries
+        self.db_seconds[key] = self.db_seconds.get(key, 0.0) + db_stats.seconds
+
+    def render(self) -> str:
+        lines = [
+            "# HELP access_http_requests_total HTTP requests by route and status code.",
+            "# TYPE access_http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            lines.append(
+                f'access_http_requests_total{{method="{method}",route="{route}",status="{status_code}"}} {count}'
+            )
+
+        lines += [
+            "# HELP access_http_request_duration_seconds HTTP request latency by route.",
+            "# TYPE access_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                cumulative += count
+                lines.append(f'access_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'access_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"access_http_request_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"access_http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP access_db_queries_total SQL statements executed by route.",
+            "# TYPE access_db_queries_total counter",
+        ]
+        for (method, route), count in sorted(self.db_queries.items()):
+            lines.append(f'access_db_queries_total{{method="{method}",route="{route}"}} {count}')
+
+        lines += [
+            "# HELP access_db_query_seconds_total Time spent executing SQL statements by route.",
+            "# TYPE access_db_query_seconds_total counter",
+        ]
+        for (method, route), seconds in sorted(self.db_seconds.items()):
+            lines.append(f'access_db_query_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+
+        lines += [
+            "# HELP access_db_pool_connections Connections held by the SQLAlchemy pool.",
+            "# TYPE access_db_pool_connections gauge",
+        ]
+        for engine_name, stats in pool_stats().items():
+            for state in ("checkedin", "checkedout"):
+                if state in stats:
+                    lines.append(f'access_db_pool_connections{{engine="{engine_name}",state="{state}"}} {stats[state]}')
+
+        limiter = anyio.to_thread.current_default_thread_limiter().statistics()
+        lines += [
+            "# HELP access_threadpool_busy_threads Worker threads currently running sync code.",
+            "# TYPE access_threadpool_busy_threads gauge",
+            f"access_threadpool_busy_threads {limiter.borrowed_tokens}",
+            "# HELP access_threadpool_queue_depth Tasks waiting for a worker thread.",
+            "# TYPE access_threadpool_queue_depth gauge",
+            f"access_threadpool_queue_depth {limiter.tasks_waiting}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _record_query(statement: str, seconds: float) -> None:
+    stats = _current_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += seconds
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    observe_queries(sync_engine, _record_query)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        db_stats = RequestDbStats()
+        token = _current_db_stats.set(db_stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_db_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            metrics_registry.record(
+                scope["method"], route_path, status_code, time.perf_counter() - started, db_stats
+            )
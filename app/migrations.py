@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+from app.constants import utcnow
+from app.services.message_search import install_message_search
+
+
+MIGRATION_LOCK_KEY = 4_212_020
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+    # Online migrations run in autocommit mode on PostgreSQL so they can use CREATE INDEX CONCURRENTLY.
+    online: bool = False
+
+
+# Schema as each migration shipped it. Migrations must keep producing the same DDL whatever the
+# ORM models in app.models become, so they never read `Model.__table__`.
+_schema = MetaData()
+
+_schema_versions = Table(
+    "access_schema_versions",
+    _schema,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False, default=utcnow),
+)
+
+_users_v1 = Table(
+    "access_users",
+    _schema,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("clerk_user_id", String(255), nullable=False),
+    Column("email", String(255), nullable=True),
+    Column("full_name", String(255), nullable=True),
+    Column("requested_role", String(20), nullable=False),
+    Column("approved_role", String(20), nullable=True),
+    Column("status", String(20), nullable=False),
+    Column("approved_by", String(255), nullable=True),
+    Column("approved_at", DateTime(timezone=True), nullable=True),
+    Column("rejection_reason", String(500), nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Index("ix_access_users_clerk_user_id", "clerk_user_id", unique=True),
+    Index("ix_access_users_status", "status"),
+)
+
+_messages_v1 = Table(
+    "access_messages",
+    _schema,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("sender_clerk_user_id", String(255), nullable=False),
+    Column("recipient_clerk_user_id", String(255), nullable=False),
+    Column("subject", String(200), nullable=False),
+    Column("body", Text, nullable=False),
+    Column("reply_to_message_id", Integer, nullable=True),
+    Column("read_at", DateTime(timezone=True), nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Index("ix_access_messages_recipient_clerk_user_id", "recipient_clerk_user_id"),
+    Index("ix_access_messages_recipient_created_id", "recipient_clerk_user_id", "created_at", "id"),
+    Index("ix_access_messages_reply_to_message_id", "reply_to_message_id"),
+    Index("ix_access_messages_sender_clerk_user_id", "sender_clerk_user_id"),
+    Index("ix_access_messages_sender_created_id", "sender_clerk_user_id", "created_at", "id"),
+)
+
+_mailbox_counters_v1 = Table(
+    "access_mailbox_counters",
+    _schema,
+    Column("clerk_user_id", String(255), primary_key=True),
+    Column("unread_count", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+_generations_v1 = Table(
+    "access_generations",
+    _schema,
+    Column("name", String(50), primary_key=True),
+    Column("value", Integer, nullable=False),
+)
+
+_deletion_jobs_v4 = Table(
+    "access_deletion_jobs",
+    _schema,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("clerk_user_id", String(255), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("requested_by", String(255), nullable=False),
+    Column("deleted_messages_count", Integer, nullable=False),
+    Column("error", String(500), nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Column("completed_at", DateTime(timezone=True), nullable=True),
+    Index("ix_access_deletion_jobs_clerk_user_id", "clerk_user_id"),
+    Index("ix_access_deletion_jobs_status", "status"),
+)
+
+
+def _create_tables(connection: Connection) -> None:
+    for table in (_users_v1, _messages_v1, _mailbox_counters_v1, _generations_v1):
+        table.create(bind=connection, checkfirst=True)
+
+
+def create_index_online(connection: Connection, index: Index) -> None:
+    if connection.dialect.name != "postgresql":
+        index.create(bind=connection, checkfirst=True)
+        return
+    preparer = connection.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(column.name) for column in index.columns)
+    unique = "UNIQUE " if index.unique else ""
+    connection.exec_driver_sql(
+        f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {preparer.quote(index.name)} "
+        f"ON {preparer.format_table(index.table)} ({columns})"
+    )
+
+
+def _create_indexes(connection: Connection) -> None:
+    for table in (_users_v1, _messages_v1):
+        for index in sorted(table.indexes, key=lambda item: item.name):
+            create_index_online(connection, index)
+
+
+def _create_deletion_jobs(connection: Connection) -> None:
+    _deletion_jobs_v4.create(bind=connection, checkfirst=True)
+
+
+def _backfill_unread_counters(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        "INSERT INTO access_mailbox_counters (clerk_user_id, unread_count, updated_at) "
+        "SELECT u.clerk_user_id, "
+        "(SELECT COUNT(*) FROM access_messages m "
+        "WHERE m.recipient_clerk_user_id = u.clerk_user_id AND m.read_at IS NULL), "
+        "CURRENT_TIMESTAMP "
+        "FROM access_users u "
+        "WHERE NOT EXISTS (SELECT 1 FROM access_mailbox_counters c WHERE c.clerk_user_id = u.clerk_user_id)"
+    )
+
+
+def _seed_generations(connection: Connection) -> None:
+    for name in ("approved_admins", "access_users"):
+        connection.execute(
+            text(
+                "INSERT INTO access_generations (name, value) SELECT :name, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM access_generations WHERE name = :name)"
+            ),
+            {"name": name},
+        )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "Create access tables", _create_tables),
+    Migration(2, "Create user and mailbox indexes", _create_indexes, online=True),
+    Migration(3, "Install message full-text search", install_message_search, online=True),
+    Migration(4, "Create user deletion jobs", _create_deletion_jobs),
+    Migration(5, "Backfill unread message counters", _backfill_unread_counters),
+    Migration(6, "Seed cache generation rows", _seed_generations),
+)
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def current_schema_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(_schema_versions.name):
+        return 0
+    return connection.scalar(select(func.max(_schema_versions.c.version))) or 0
+
+
+def check_schema_version(connection: Connection) -> None:
+    version = current_schema_version(connection)
+    if version < LATEST_SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {LATEST_SCHEMA_VERSION}. "
+            "Run `python -m app.cli migrate`."
+        )
+
+
+def _record(connection: Connection, migration: Migration) -> None:
+    connection.execute(
+        insert(_schema_versions).values(version=migration.version, description=migration.description)
+    )
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> list[Migration]:
+    target = LATEST_SCHEMA_VERSION if target is None else target
+    is_postgresql = engine.dialect.name == "postgresql"
+    applied: list[Migration] = []
+
+    with engine.connect() as connection:
+        if is_postgresql:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+        try:
+            with connection.begin():
+                _schema_versions.create(bind=connection, checkfirst=True)
+            version = current_schema_version(connection)
+            connection.commit()
+
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+                if migration.online and is_postgresql:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as online_connection:
+                        migration.upgrade(online_connection)
+                    with connection.begin():
+                        _record(connection, migration)
+                else:
+                    with connection.begin():
+                        migration.upgrade(connection)
+                        _record(connection, migration)
+                applied.append(migration)
+        finally:
+            if is_postgresql:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+    return applied
@@ -3,10 +3,10 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Integer, String, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.constants import AccessStatus, utcnow
+from app.constants import AccessStatus, DeletionJobStatus, utcnow
 from app.db import Base
 
 
@@ -34,6 +34,11 @@ class AccessUser(Base):
 
 class AccessMessage(Base):
     __tablename__ = "access_messages"
+    __table_args__ = (
+        Index("ix_access_messages_recipient_created_id", "recipient_clerk_user_id", "created_at", "id"),
+        Index("ix_access_messages_sender_created_id", "sender_clerk_user_id", "created_at", "id"),
+        Index("ix_access_messages_reply_to_message_id", "reply_to_message_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sender_clerk_user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -49,3 +54,50 @@ class AccessMessage(Base):
         default=utcnow,
         onupdate=utcnow,
     )
+
+
+class AccessMailboxCounter(Base):
+    __tablename__ = "access_mailbox_counters"
+
+    clerk_user_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    unread_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utcnow,
+        onupdate=utcnow,
+    )
+
+
+class AccessGeneration(Base):
+    __tablename__ = "access_generations"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class AccessSchemaVersion(Base):
+    __tablename__ = "access_schema_versions"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    description: Mapped[str] = mapped_column(String(255), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class AccessDeletionJob(Base):
+    __tablename__ = "access_deletion_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    clerk_user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, index=True, default=DeletionJobStatus.pending.value)
+    requested_by: Mapped[str] = mapped_column(String(255), nullable=False)
+    deleted_messages_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utcnow,
+        onupdate=utcnow,
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
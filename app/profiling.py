@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import ACCESS_PROFILING_N_PLUS_ONE_THRESHOLD, ACCESS_PROFILING_SLOW_QUERY_MS
+from app.db import observe_queries
+
+
+logger = logging.getLogger("app.profiling")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class RecordedStatement:
+    shape: str
+    seconds: float
+
+
+@dataclass
+class RequestProfile:
+    statements: list[RecordedStatement] = field(default_factory=list)
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(statement.seconds for statement in self.statements)
+
+    def repeated_shapes(self) -> list[tuple[str, int]]:
+        counts = Counter(statement.shape for statement in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count >= ACCESS_PROFILING_N_PLUS_ONE_THRESHOLD]
+
+    def slow_statements(self) -> list[RecordedStatement]:
+        threshold = ACCESS_PROFILING_SLOW_QUERY_MS / 1000
+        return [statement for statement in self.statements if statement.seconds >= threshold]
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def normalize_statement(statement: str) -> str:
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _record_statement(statement: str, seconds: float) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.statements.append(RecordedStatement(normalize_statement(statement), seconds))
+
+
+def profile_engine(sync_engine: Engine) -> None:
+    observe_queries(sync_engine, _record_statement)
+
+
+def _server_timing(profile: RequestProfile, app_seconds: float) -> str:
+    return (
+        f'db;dur={profile.db_seconds * 1000:.2f};desc="{len(profile.statements)} queries", '
+        f"app;dur={app_seconds * 1000:.2f}"
+    )
+
+
+def _log_profile(scope: Scope, status_code: int, seconds: float, profile: RequestProfile) -> None:
+    repeated = profile.repeated_shapes()
+    slow = profile.slow_statements()
+    record = {
+        "method": scope["method"],
+        "route": getattr(scope.get("route"), "path", scope["path"]),
+        "status": status_code,
+        "duration_ms": round(seconds * 1000, 2),
+        "queries": len(profile.statements),
+        "db_ms": round(profile.db_seconds * 1000, 2),
+        "n_plus_one": [{"statement": shape, "count": count} for shape, count in repeated],
+        "slow_queries": [{"statement": item.shape, "ms": round(item.seconds * 1000, 2)} for item in slow],
+    }
+    logger.log(logging.WARNING if repeated or slow else logging.INFO, json.dumps(record))
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", _server_timing(profile, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            _log_profile(scope, status_code, time.perf_counter() - started, profile)
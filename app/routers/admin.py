@@ -1,81 +1,170 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-
-from app.deps import get_db, require_api_key, require_approved_admin
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.constants import UserDeletionMode
+from app.http_cache import etag_matches, not_modified
+from app.deps import (
+    DbSession,
+    get_read_session,
+    get_session,
+    record_actor_write,
+    require_api_key,
+    require_approved_admin,
+    run_db,
+)
 from app.models import AccessUser
 from app.schemas import (
     AccessProfileResponse,
     AdminUserResponse,
     ApproveRequest,
+    BulkApproveRequest,
+    BulkRejectRequest,
+    BulkUserActionResult,
     CreateAdminUserRequest,
     DeleteUserResponse,
+    DeletionJobResponse,
     PendingUserResponse,
     RejectRequest,
 )
+from app.serialization import json_response
 from app.services.access_service import (
     approve_user,
+    approve_users,
     create_user_as_admin,
     delete_user,
     get_all_users,
     get_pending_users,
     reject_user,
+    reject_users,
+    schedule_user_deletion,
+    users_etag,
 )
+from app.services.deletion_jobs import get_deletion_job, notify_deletion_worker
+from app.services.export_service import export_user_messages_statement, export_users_statement, stream_ndjson
 
 
-router = APIRouter(prefix="/admin", dependencies=[Depends(require_api_key)])
+router = APIRouter(
+    prefix="/admin",
+    dependencies=[Depends(require_api_key), Depends(record_actor_write)],
+)
 
 
 @router.get("/users/pending", response_model=list[PendingUserResponse])
-def get_pending_users_route(
-    db: Session = Depends(get_db),
+async def get_pending_users_route(
+    if_none_match: Optional[str] = Header(default=None),
+    db: DbSession = Depends(get_read_session),
     _: AccessUser = Depends(require_approved_admin),
-) -> list[PendingUserResponse]:
-    return get_pending_users(db)
+) -> Response:
+    etag = await run_db(db, users_etag, "admin-pending-users")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(await run_db(db, get_pending_users), headers={"ETag": etag})
 
 
 @router.get("/users", response_model=list[AdminUserResponse])
-def get_all_users_route(
-    db: Session = Depends(get_db),
+async def get_all_users_route(
+    if_none_match: Optional[str] = Header(default=None),
+    db: DbSession = Depends(get_read_session),
+    _: AccessUser = Depends(require_approved_admin),
+) -> Response:
+    etag = await run_db(db, users_etag, "admin-users")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(await run_db(db, get_all_users), headers={"ETag": etag})
+
+
+@router.get("/export/users")
+async def export_users_route(_: AccessUser = Depends(require_approved_admin)) -> StreamingResponse:
+    return StreamingResponse(
+        stream_ndjson(export_users_statement()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
+
+
+@router.get("/export/users/{clerk_user_id}/messages")
+async def export_user_messages_route(
+    clerk_user_id: str,
     _: AccessUser = Depends(require_approved_admin),
-) -> list[AdminUserResponse]:
-    return get_all_users(db)
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_ndjson(export_user_messages_statement(clerk_user_id)),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="messages.ndjson"'},
+    )
 
 
 @router.post("/users", response_model=AccessProfileResponse)
-def create_user_as_admin_route(
+async def create_user_as_admin_route(
     payload: CreateAdminUserRequest,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
     actor: AccessUser = Depends(require_approved_admin),
 ) -> AccessProfileResponse:
-    return create_user_as_admin(payload, actor, db)
+    return await run_db(db, create_user_as_admin, payload, actor)
+
+
+@router.post("/users/bulk-approve", response_model=list[BulkUserActionResult])
+async def approve_users_route(
+    payload: BulkApproveRequest,
+    db: DbSession = Depends(get_session),
+    actor: AccessUser = Depends(require_approved_admin),
+) -> list[BulkUserActionResult]:
+    return await run_db(db, approve_users, payload, actor)
+
+
+@router.post("/users/bulk-reject", response_model=list[BulkUserActionResult])
+async def reject_users_route(
+    payload: BulkRejectRequest,
+    db: DbSession = Depends(get_session),
+    actor: AccessUser = Depends(require_approved_admin),
+) -> list[BulkUserActionResult]:
+    return await run_db(db, reject_users, payload, actor)
 
 
 @router.post("/users/{clerk_user_id}/approve", response_model=AccessProfileResponse)
-def approve_user_route(
+async def approve_user_route(
     clerk_user_id: str,
     payload: ApproveRequest,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
     actor: AccessUser = Depends(require_approved_admin),
 ) -> AccessProfileResponse:
-    return approve_user(clerk_user_id, payload, actor, db)
+    return await run_db(db, approve_user, clerk_user_id, payload, actor)
 
 
 @router.post("/users/{clerk_user_id}/reject", response_model=AccessProfileResponse)
-def reject_user_route(
+async def reject_user_route(
     clerk_user_id: str,
     payload: RejectRequest,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
     actor: AccessUser = Depends(require_approved_admin),
 ) -> AccessProfileResponse:
-    return reject_user(clerk_user_id, payload, actor, db)
+    return await run_db(db, reject_user, clerk_user_id, payload, actor)
 
 
-@router.delete("/users/{clerk_user_id}", response_model=DeleteUserResponse)
-def delete_user_route(
+@router.delete("/users/{clerk_user_id}", response_model=Union[DeleteUserResponse, DeletionJobResponse])
+async def delete_user_route(
     clerk_user_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    mode: UserDeletionMode = Query(default=UserDeletionMode.immediate),
+    db: DbSession = Depends(get_session),
     actor: AccessUser = Depends(require_approved_admin),
-) -> DeleteUserResponse:
-    return delete_user(clerk_user_id, actor, db)
+) -> Union[DeleteUserResponse, DeletionJobResponse]:
+    if mode == UserDeletionMode.immediate:
+        return await run_db(db, delete_user, clerk_user_id, actor)
+    job = await run_db(db, schedule_user_deletion, clerk_user_id, actor)
+    notify_deletion_worker()
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job
+
+
+@router.get("/deletion-jobs/{job_id}", response_model=DeletionJobResponse)
+async def get_deletion_job_route(
+    job_id: int,
+    db: DbSession = Depends(get_session),
+    _: AccessUser = Depends(require_approved_admin),
+) -> DeletionJobResponse:
+    return await run_db(db, get_deletion_job, job_id)
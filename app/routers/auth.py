@@ -1,17 +1,39 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Response
 
-from app.deps import get_db, require_api_key
-from app.schemas import AccessProfileResponse, SyncRequest
-from app.services.access_service import sync_user
+from app.deps import DbSession, get_session, require_api_key, run_db
+from app.schemas import (
+    AccessProfileResponse,
+    BatchSyncRequest,
+    BulkUserActionResult,
+    PermissionCheckRequest,
+    PermissionCheckResponse,
+    SyncRequest,
+)
+from app.serialization import json_response
+from app.services.access_service import check_permissions, sync_user, sync_users
 
 
 router = APIRouter(prefix="/auth", dependencies=[Depends(require_api_key)])
 
 
 @router.post("/sync", response_model=AccessProfileResponse)
-def sync_user_route(payload: SyncRequest, db: Session = Depends(get_db)) -> AccessProfileResponse:
-    return sync_user(payload, db)
+async def sync_user_route(payload: SyncRequest, db: DbSession = Depends(get_session)) -> Response:
+    return json_response(await run_db(db, sync_user, payload))
 
+
+@router.post("/sync/batch", response_model=list[BulkUserActionResult])
+async def sync_users_route(
+    payload: BatchSyncRequest,
+    db: DbSession = Depends(get_session),
+) -> Response:
+    return json_response(await run_db(db, sync_users, payload))
+
+
+@router.post("/check", response_model=PermissionCheckResponse)
+async def check_permissions_route(
+    payload: PermissionCheckRequest,
+    db: DbSession = Depends(get_session),
+) -> PermissionCheckResponse:
+    return await run_db(db, check_permissions, payload)
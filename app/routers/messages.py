@@ -1,84 +1,212 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-
-from app.deps import get_db, require_api_key, require_approved_user
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.constants import MESSAGES_PAGE_DEFAULT_LIMIT, MESSAGES_PAGE_MAX_LIMIT, MESSAGES_SEARCH_MAX_QUERY_LENGTH
+from app.deps import (
+    DbSession,
+    get_read_session,
+    get_session,
+    open_session,
+    record_actor_write,
+    require_api_key,
+    require_approved_stream_user,
+    require_approved_user,
+    run_db,
+)
+from app.http_cache import etag_matches, not_modified
 from app.models import AccessUser
 from app.schemas import (
+    BroadcastMessageRequest,
+    BroadcastMessageResponse,
+    MessagePageResponse,
     MessageResponse,
+    MessageSummaryPageResponse,
     MessagingUserResponse,
     ReadAllMessagesResponse,
+    ReadMessagesRequest,
+    ReadMessagesResponse,
     SendMessageRequest,
     UnreadCountResponse,
 )
+from app.serialization import json_response
+from app.services.access_service import users_etag
 from app.services.messaging_service import (
+    broadcast_message,
+    get_message,
+    get_message_thread,
     get_unread_messages_count,
     list_inbox_messages,
+    list_inbox_summaries,
     list_organization_users,
     list_sent_messages,
+    list_sent_summaries,
     mark_all_messages_as_read,
     mark_message_as_read,
+    mark_messages_as_read,
+    search_messages,
     send_message,
 )
+from app.services.notification_hub import notification_hub, stream_events
 
 
-router = APIRouter(prefix="/messages", dependencies=[Depends(require_api_key)])
+router = APIRouter(
+    prefix="/messages",
+    dependencies=[Depends(require_api_key), Depends(record_actor_write)],
+)
 
 
 @router.get("/users", response_model=list[MessagingUserResponse])
-def list_organization_users_route(
-    db: Session = Depends(get_db),
+async def list_organization_users_route(
+    if_none_match: Optional[str] = Header(default=None),
+    db: DbSession = Depends(get_read_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> Response:
+    etag = await run_db(db, users_etag, f"messaging-users:{actor.clerk_user_id}")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(await run_db(db, list_organization_users, actor), headers={"ETag": etag})
+
+
+@router.get("/inbox", response_model=MessagePageResponse)
+async def list_inbox_messages_route(
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=MESSAGES_PAGE_DEFAULT_LIMIT, ge=1, le=MESSAGES_PAGE_MAX_LIMIT),
+    db: DbSession = Depends(get_read_session),
     actor: AccessUser = Depends(require_approved_user),
-) -> list[MessagingUserResponse]:
-    return list_organization_users(actor, db)
+) -> Response:
+    return json_response(await run_db(db, list_inbox_messages, actor, cursor=cursor, limit=limit))
 
 
-@router.get("/inbox", response_model=list[MessageResponse])
-def list_inbox_messages_route(
-    db: Session = Depends(get_db),
+@router.get("/inbox/summary", response_model=MessageSummaryPageResponse)
+async def list_inbox_summaries_route(
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=MESSAGES_PAGE_DEFAULT_LIMIT, ge=1, le=MESSAGES_PAGE_MAX_LIMIT),
+    db: DbSession = Depends(get_read_session),
     actor: AccessUser = Depends(require_approved_user),
-) -> list[MessageResponse]:
-    return list_inbox_messages(actor, db)
+) -> Response:
+    return json_response(await run_db(db, list_inbox_summaries, actor, cursor=cursor, limit=limit))
 
 
-@router.get("/sent", response_model=list[MessageResponse])
-def list_sent_messages_route(
-    db: Session = Depends(get_db),
+@router.get("/sent", response_model=MessagePageResponse)
+async def list_sent_messages_route(
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=MESSAGES_PAGE_DEFAULT_LIMIT, ge=1, le=MESSAGES_PAGE_MAX_LIMIT),
+    db: DbSession = Depends(get_read_session),
     actor: AccessUser = Depends(require_approved_user),
-) -> list[MessageResponse]:
-    return list_sent_messages(actor, db)
+) -> Response:
+    return json_response(await run_db(db, list_sent_messages, actor, cursor=cursor, limit=limit))
+
+
+@router.get("/sent/summary", response_model=MessageSummaryPageResponse)
+async def list_sent_summaries_route(
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=MESSAGES_PAGE_DEFAULT_LIMIT, ge=1, le=MESSAGES_PAGE_MAX_LIMIT),
+    db: DbSession = Depends(get_read_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> Response:
+    return json_response(await run_db(db, list_sent_summaries, actor, cursor=cursor, limit=limit))
+
+
+@router.get("/search", response_model=MessagePageResponse)
+async def search_messages_route(
+    q: str = Query(min_length=1, max_length=MESSAGES_SEARCH_MAX_QUERY_LENGTH),
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=MESSAGES_PAGE_DEFAULT_LIMIT, ge=1, le=MESSAGES_PAGE_MAX_LIMIT),
+    db: DbSession = Depends(get_read_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> Response:
+    return json_response(await run_db(db, search_messages, q, actor, cursor=cursor, limit=limit))
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
-def get_unread_messages_count_route(
-    db: Session = Depends(get_db),
+async def get_unread_messages_count_route(
+    db: DbSession = Depends(get_read_session),
     actor: AccessUser = Depends(require_approved_user),
 ) -> UnreadCountResponse:
-    return UnreadCountResponse(count=get_unread_messages_count(actor, db))
+    return UnreadCountResponse(count=await run_db(db, get_unread_messages_count, actor))
+
+
+@router.get("/stream")
+async def stream_messages_route(
+    request: Request,
+    actor: AccessUser = Depends(require_approved_stream_user),
+) -> StreamingResponse:
+    subscription = notification_hub.subscribe(actor.clerk_user_id)
+    try:
+        async with open_session() as db:
+            unread_count = await run_db(db, get_unread_messages_count, actor)
+    except BaseException:
+        notification_hub.unsubscribe(subscription)
+        raise
+    return StreamingResponse(
+        stream_events(request, subscription, [("unread_count", {"count": unread_count})]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/read-all", response_model=ReadAllMessagesResponse)
-def mark_all_messages_as_read_route(
-    db: Session = Depends(get_db),
+async def mark_all_messages_as_read_route(
+    db: DbSession = Depends(get_session),
     actor: AccessUser = Depends(require_approved_user),
 ) -> ReadAllMessagesResponse:
-    return ReadAllMessagesResponse(updated_count=mark_all_messages_as_read(actor, db))
+    return ReadAllMessagesResponse(updated_count=await run_db(db, mark_all_messages_as_read, actor))
+
+
+@router.post("/read", response_model=ReadMessagesResponse)
+async def mark_messages_as_read_route(
+    payload: ReadMessagesRequest,
+    db: DbSession = Depends(get_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> ReadMessagesResponse:
+    message_ids = await run_db(db, mark_messages_as_read, payload.message_ids, actor)
+    return ReadMessagesResponse(updated_count=len(message_ids), message_ids=message_ids)
 
 
 @router.post("/send", response_model=MessageResponse)
-def send_message_route(
+async def send_message_route(
     payload: SendMessageRequest,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
     actor: AccessUser = Depends(require_approved_user),
 ) -> MessageResponse:
-    return send_message(payload, actor, db)
+    return await run_db(db, send_message, payload, actor)
+
+
+@router.post("/broadcast", response_model=BroadcastMessageResponse)
+async def broadcast_message_route(
+    payload: BroadcastMessageRequest,
+    db: DbSession = Depends(get_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> BroadcastMessageResponse:
+    return await run_db(db, broadcast_message, payload, actor)
+
+
+@router.get("/{message_id}/thread", response_model=list[MessageResponse])
+async def get_message_thread_route(
+    message_id: int,
+    db: DbSession = Depends(get_read_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> list[MessageResponse]:
+    return await run_db(db, get_message_thread, message_id, actor)
 
 
 @router.post("/{message_id}/read", response_model=MessageResponse)
-def mark_message_as_read_route(
+async def mark_message_as_read_route(
+    message_id: int,
+    db: DbSession = Depends(get_session),
+    actor: AccessUser = Depends(require_approved_user),
+) -> MessageResponse:
+    return await run_db(db, mark_message_as_read, message_id, actor)
+
+
+@router.get("/{message_id:int}", response_model=MessageResponse)
+async def get_message_route(
     message_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_session),
     actor: AccessUser = Depends(require_approved_user),
 ) -> MessageResponse:
-    return mark_message_as_read(message_id, actor, db)
+    return await run_db(db, get_message, message_id, actor)
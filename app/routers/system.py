@@ -1,19 +1,53 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from typing import Any, Optional, Union
 
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi.responses import PlainTextResponse
+
+from app.cache import actor_cache
+from app.config import ACCESS_METRICS_ENABLED
 from app.constants import PERMISSIONS_BY_ROLE
+from app.db import pool_stats
+from app.http_cache import etag_matches, make_etag, not_modified
+from app.metrics import metrics_registry
 
 
 router = APIRouter()
 
+ROLES = {role.value: permissions for role, permissions in PERMISSIONS_BY_ROLE.items()}
+ROLES_ETAG = make_etag("roles", sorted(ROLES.items()))
+
 
 @router.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@router.get("/roles")
-def list_roles() -> dict[str, list[str]]:
-    return {role.value: permissions for role, permissions in PERMISSIONS_BY_ROLE.items()}
+@router.get("/health/cache")
+def cache_stats() -> dict[str, dict[str, int]]:
+    return {"actor_cache": actor_cache.stats()}
+
+
+@router.get("/health/db")
+def db_pool_stats() -> dict[str, dict[str, Any]]:
+    return pool_stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    if not ACCESS_METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/roles", response_model=dict[str, list[str]])
+def list_roles(
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Union[dict[str, list[str]], Response]:
+    if etag_matches(if_none_match, ROLES_ETAG):
+        return not_modified(ROLES_ETAG)
+    response.headers["ETag"] = ROLES_ETAG
+    return ROLES
 
@@ -5,7 +5,17 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from app.constants import AccessRole, AccessStatus
+from app.constants import (
+    AccessRole,
+    AccessStatus,
+    ADMIN_BULK_MAX_ITEMS,
+    BROADCAST_MAX_RECIPIENTS,
+    BulkActionOutcome,
+    DeletionJobStatus,
+    PERMISSION_CHECK_MAX_ITEMS,
+    READ_BATCH_MAX_ITEMS,
+    SYNC_BATCH_MAX_ITEMS,
+)
 
 
 class SyncRequest(BaseModel):
@@ -15,6 +25,10 @@ class SyncRequest(BaseModel):
     requested_role: AccessRole
 
 
+class BatchSyncRequest(BaseModel):
+    items: list[SyncRequest] = Field(min_length=1, max_length=SYNC_BATCH_MAX_ITEMS)
+
+
 class AccessProfileResponse(BaseModel):
     clerk_user_id: str
     email: Optional[str]
@@ -28,6 +42,26 @@ class AccessProfileResponse(BaseModel):
     rejection_reason: Optional[str]
 
 
+class PermissionCheckItem(BaseModel):
+    permission: str = Field(min_length=1, max_length=255)
+    actor_clerk_user_id: Optional[str] = Field(default=None, min_length=1, max_length=255)
+
+
+class PermissionCheckRequest(BaseModel):
+    actor_clerk_user_id: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    checks: list[PermissionCheckItem] = Field(min_length=1, max_length=PERMISSION_CHECK_MAX_ITEMS)
+
+
+class PermissionCheckResult(BaseModel):
+    actor_clerk_user_id: Optional[str]
+    permission: str
+    allowed: bool
+
+
+class PermissionCheckResponse(BaseModel):
+    results: list[PermissionCheckResult]
+
+
 class PendingUserResponse(BaseModel):
     clerk_user_id: str
     email: Optional[str]
@@ -64,11 +98,47 @@ class RejectRequest(BaseModel):
     reason: Optional[str] = Field(default=None, max_length=500)
 
 
+class BulkApproveItem(BaseModel):
+    clerk_user_id: str = Field(min_length=1, max_length=255)
+    approved_role: Optional[AccessRole] = None
+
+
+class BulkApproveRequest(BaseModel):
+    items: list[BulkApproveItem] = Field(min_length=1, max_length=ADMIN_BULK_MAX_ITEMS)
+
+
+class BulkRejectItem(BaseModel):
+    clerk_user_id: str = Field(min_length=1, max_length=255)
+    reason: Optional[str] = Field(default=None, max_length=500)
+
+
+class BulkRejectRequest(BaseModel):
+    items: list[BulkRejectItem] = Field(min_length=1, max_length=ADMIN_BULK_MAX_ITEMS)
+
+
+class BulkUserActionResult(BaseModel):
+    clerk_user_id: str
+    outcome: BulkActionOutcome
+    profile: Optional[AccessProfileResponse]
+
+
 class DeleteUserResponse(BaseModel):
     clerk_user_id: str
     deleted_messages_count: int
 
 
+class DeletionJobResponse(BaseModel):
+    job_id: int
+    clerk_user_id: str
+    status: DeletionJobStatus
+    requested_by: str
+    deleted_messages_count: int
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime]
+
+
 class MessagingUserResponse(BaseModel):
     clerk_user_id: str
     email: Optional[str]
@@ -82,6 +152,18 @@ class SendMessageRequest(BaseModel):
     reply_to_message_id: Optional[int] = None
 
 
+class BroadcastMessageRequest(BaseModel):
+    recipient_clerk_user_ids: Optional[list[str]] = Field(default=None, min_length=1, max_length=BROADCAST_MAX_RECIPIENTS)
+    approved_role: Optional[AccessRole] = None
+    subject: str = Field(min_length=1, max_length=200)
+    body: str = Field(min_length=1, max_length=5000)
+
+
+class BroadcastMessageResponse(BaseModel):
+    sent_count: int
+    recipient_clerk_user_ids: list[str]
+
+
 class MessageResponse(BaseModel):
     id: int
     sender_clerk_user_id: str
@@ -97,9 +179,43 @@ class MessageResponse(BaseModel):
     created_at: datetime
 
 
+class MessagePageResponse(BaseModel):
+    items: list[MessageResponse]
+    next_cursor: Optional[str]
+
+
+class MessageSummaryResponse(BaseModel):
+    id: int
+    sender_clerk_user_id: str
+    sender_email: Optional[str]
+    sender_full_name: Optional[str]
+    recipient_clerk_user_id: str
+    recipient_email: Optional[str]
+    recipient_full_name: Optional[str]
+    subject: str
+    body_preview: str
+    reply_to_message_id: Optional[int]
+    read_at: Optional[datetime]
+    created_at: datetime
+
+
+class MessageSummaryPageResponse(BaseModel):
+    items: list[MessageSummaryResponse]
+    next_cursor: Optional[str]
+
+
 class UnreadCountResponse(BaseModel):
     count: int
 
 
 class ReadAllMessagesResponse(BaseModel):
     updated_count: int
+
+
+class ReadMessagesRequest(BaseModel):
+    message_ids: list[int] = Field(min_length=1, max_length=READ_BATCH_MAX_ITEMS)
+
+
+class ReadMessagesResponse(BaseModel):
+    updated_count: int
+    message_ids: list[int]
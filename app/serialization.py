@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _encode_model(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_model, option=orjson.OPT_UTC_Z)
+
+
+def json_response(content: Any, headers: Optional[dict[str, str]] = None) -> FastJSONResponse:
+    return FastJSONResponse(content, headers=headers)
@@ -1,21 +1,46 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from typing import Any, Optional
+
 from fastapi import HTTPException, status
-from sqlalchemy import delete, func, or_, select
+from sqlalchemy import delete, func, or_, select, update
 from sqlalchemy.orm import Session
 
-from app.constants import AccessRole, AccessStatus, PERMISSIONS_BY_ROLE, utcnow
-from app.models import AccessMessage, AccessUser
+from app.cache import CachedActor, actor_cache, admin_count_cache
+from app.constants import (
+    AccessRole,
+    AccessStatus,
+    BulkActionOutcome,
+    PERMISSION_SETS_BY_ROLE,
+    PERMISSIONS_BY_ROLE,
+    SYNC_BATCH_MAX_ATTEMPTS,
+    utcnow,
+)
+from app.db import as_stored, upsert
+from app.http_cache import make_etag
+from app.models import AccessDeletionJob, AccessMessage, AccessUser
 from app.schemas import (
     AccessProfileResponse,
     AdminUserResponse,
     ApproveRequest,
+    BatchSyncRequest,
+    BulkApproveRequest,
+    BulkRejectRequest,
+    BulkUserActionResult,
     CreateAdminUserRequest,
     DeleteUserResponse,
+    DeletionJobResponse,
     PendingUserResponse,
+    PermissionCheckRequest,
+    PermissionCheckResponse,
+    PermissionCheckResult,
     RejectRequest,
     SyncRequest,
 )
+from app.services.deletion_jobs import build_deletion_job, ensure_not_pending_deletion, pending_deletion_ids
+from app.services.generations import ACCESS_USERS, APPROVED_ADMINS, bump_generations, get_generation
+from app.services.unread_counter import adjust_unread_counts, drop_unread_counter, seed_unread_counters
 
 
 def build_profile(user: AccessUser) -> AccessProfileResponse:
@@ -25,7 +50,7 @@ def build_profile(user: AccessUser) -> AccessProfileResponse:
         if approved_role and user.status == AccessStatus.approved.value
         else []
     )
-    return AccessProfileResponse(
+    return AccessProfileResponse.model_construct(
         clerk_user_id=user.clerk_user_id,
         email=user.email,
         full_name=user.full_name,
@@ -39,7 +64,11 @@ def build_profile(user: AccessUser) -> AccessProfileResponse:
     )
 
 
-def has_approved_admin(db: Session) -> bool:
+def _is_approved_admin(status: str, approved_role: Optional[str]) -> bool:
+    return status == AccessStatus.approved.value and approved_role == AccessRole.admin.value
+
+
+def _count_approved_admins(db: Session) -> int:
     admin_count = db.scalar(
         select(func.count())
         .select_from(AccessUser)
@@ -48,14 +77,45 @@ def has_approved_admin(db: Session) -> bool:
             AccessUser.approved_role == AccessRole.admin.value,
         )
     )
-    return bool(admin_count and admin_count > 0)
+    return int(admin_count or 0)
+
+
+def approved_admin_count(db: Session) -> int:
+    version = get_generation(db, APPROVED_ADMINS)
+    admin_count = admin_count_cache.get(version)
+    if admin_count is None:
+        admin_count = _count_approved_admins(db)
+        if get_generation(db, APPROVED_ADMINS) == version:
+            admin_count_cache.store(admin_count, version)
+    return admin_count
+
+
+def has_approved_admin(db: Session) -> bool:
+    return approved_admin_count(db) > 0
+
+
+def _record_user_changes(db: Session, admin_delta: int) -> Optional[int]:
+    # One statement, right before commit, keeps the generation row locks short.
+    names = [ACCESS_USERS, APPROVED_ADMINS] if admin_delta else [ACCESS_USERS]
+    return bump_generations(db, names).get(APPROVED_ADMINS)
+
+
+def users_etag(scope: str, db: Session) -> str:
+    return make_etag(scope, get_generation(db, ACCESS_USERS))
+
+
+def _apply_admin_change(delta: int, version: Optional[int]) -> None:
+    if version is not None:
+        admin_count_cache.apply(delta, version)
 
 
 def sync_user(payload: SyncRequest, db: Session) -> AccessProfileResponse:
     user = db.scalar(select(AccessUser).where(AccessUser.clerk_user_id == payload.clerk_user_id))
+    was_approved_admin = user is not None and _is_approved_admin(user.status, user.approved_role)
     approved_admin_exists = has_approved_admin(db)
 
     if user is None:
+        ensure_not_pending_deletion(db, [payload.clerk_user_id])
         user = AccessUser(
             clerk_user_id=payload.clerk_user_id,
             email=payload.email,
@@ -69,33 +129,216 @@ def sync_user(payload: SyncRequest, db: Session) -> AccessProfileResponse:
             user.approved_by = "bootstrap-first-admin"
             user.approved_at = utcnow()
         db.add(user)
+        db.flush()
+        seed_unread_counters(db, [user.clerk_user_id])
     else:
-        user.email = payload.email
-        user.full_name = payload.full_name
-        user.updated_at = utcnow()
-
+        changes: dict[str, Any] = {"email": payload.email, "full_name": payload.full_name}
         if user.status == AccessStatus.pending.value:
-            user.requested_role = payload.requested_role.value
+            changes["requested_role"] = payload.requested_role.value
 
             if payload.requested_role == AccessRole.admin and not approved_admin_exists:
-                user.status = AccessStatus.approved.value
-                user.approved_role = AccessRole.admin.value
-                user.approved_by = "bootstrap-first-admin"
-                user.approved_at = utcnow()
+                changes.update(
+                    status=AccessStatus.approved.value,
+                    approved_role=AccessRole.admin.value,
+                    approved_by="bootstrap-first-admin",
+                    approved_at=utcnow(),
+                )
+        changes = {name: value for name, value in changes.items() if getattr(user, name) != value}
+        if not changes:
+            return build_profile(user)
+        for name, value in changes.items():
+            setattr(user, name, value)
+        user.updated_at = utcnow()
 
+    admin_delta = int(_is_approved_admin(user.status, user.approved_role)) - int(was_approved_admin)
+    admin_version = _record_user_changes(db, admin_delta)
     db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+    actor_cache.invalidate(user.clerk_user_id)
     db.refresh(user)
     return build_profile(user)
 
 
+def _load_user_rows(db: Session, clerk_user_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+    rows = db.execute(
+        select(AccessUser.__table__).where(AccessUser.clerk_user_id.in_(set(clerk_user_ids)))
+    ).mappings()
+    return {row["clerk_user_id"]: dict(row) for row in rows}
+
+
+def _as_stored_user(db: Session, row: dict[str, Any]) -> AccessUser:
+    stored = {
+        name: as_stored(db, getattr(AccessUser, name), row[name])
+        for name in ("approved_at", "created_at", "updated_at")
+    }
+    return AccessUser(**{**row, **stored})
+
+
+def _sync_results(
+    db: Session,
+    snapshots: list[tuple[str, Optional[dict[str, Any]]]],
+) -> list[BulkUserActionResult]:
+    return [
+        BulkUserActionResult(
+            clerk_user_id=clerk_user_id,
+            outcome=BulkActionOutcome.synced if row is not None else BulkActionOutcome.pending_deletion,
+            profile=build_profile(_as_stored_user(db, row)) if row is not None else None,
+        )
+        for clerk_user_id, row in snapshots
+    ]
+
+
+def sync_users(payload: BatchSyncRequest, db: Session) -> list[BulkUserActionResult]:
+    # A concurrent sync can insert one of our new users first; replay the batch so it is treated as existing.
+    for _ in range(SYNC_BATCH_MAX_ATTEMPTS):
+        results = _sync_users_once(payload, db)
+        if results is not None:
+            return results
+        db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Users were created concurrently, retry the batch",
+    )
+
+
+def _sync_users_once(payload: BatchSyncRequest, db: Session) -> Optional[list[BulkUserActionResult]]:
+    clerk_user_ids = {item.clerk_user_id for item in payload.items}
+    rows_by_id = _load_user_rows(db, clerk_user_ids)
+    existing_ids = set(rows_by_id)
+    new_ids = clerk_user_ids - existing_ids
+    blocked_ids = pending_deletion_ids(db, new_ids) if new_ids else set()
+    new_ids -= blocked_ids
+    approved_admin_exists = has_approved_admin(db)
+    timestamp = utcnow()
+
+    admin_delta = 0
+    changed_ids: set[str] = set()
+    snapshots: list[tuple[str, Optional[dict[str, Any]]]] = []
+    for item in payload.items:
+        if item.clerk_user_id in blocked_ids:
+            snapshots.append((item.clerk_user_id, None))
+            continue
+        row = rows_by_id.get(item.clerk_user_id)
+        if row is None:
+            row = {
+                "clerk_user_id": item.clerk_user_id,
+                "requested_role": item.requested_role.value,
+                "approved_role": None,
+                "status": AccessStatus.pending.value,
+                "approved_by": None,
+                "approved_at": None,
+                "rejection_reason": None,
+                "created_at": timestamp,
+            }
+            rows_by_id[item.clerk_user_id] = row
+        before = dict(row)
+        row["email"] = item.email
+        row["full_name"] = item.full_name
+
+        if row["status"] == AccessStatus.pending.value:
+            row["requested_role"] = item.requested_role.value
+
+            if item.requested_role == AccessRole.admin and not approved_admin_exists:
+                row["status"] = AccessStatus.approved.value
+                row["approved_role"] = AccessRole.admin.value
+                row["approved_by"] = "bootstrap-first-admin"
+                row["approved_at"] = timestamp
+                approved_admin_exists = True
+                admin_delta += 1
+
+        if row != before or item.clerk_user_id in new_ids:
+            row["updated_at"] = timestamp
+            changed_ids.add(item.clerk_user_id)
+        snapshots.append((item.clerk_user_id, dict(row)))
+
+    if not changed_ids:
+        return _sync_results(db, snapshots)
+
+    new_rows = [rows_by_id[clerk_user_id] for clerk_user_id in changed_ids & new_ids]
+    changed_rows = [rows_by_id[clerk_user_id] for clerk_user_id in changed_ids - new_ids]
+    if new_rows:
+        inserted_ids = set(
+            db.scalars(
+                upsert(db, AccessUser)
+                .on_conflict_do_nothing(index_elements=[AccessUser.clerk_user_id])
+                .returning(AccessUser.clerk_user_id),
+                new_rows,
+            )
+        )
+        if inserted_ids != new_ids:
+            return None
+        seed_unread_counters(db, new_ids)
+    if changed_rows:
+        db.execute(update(AccessUser), changed_rows)
+    admin_version = _record_user_changes(db, admin_delta)
+    db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+
+    for clerk_user_id in changed_ids:
+        actor_cache.invalidate(clerk_user_id)
+    return _sync_results(db, snapshots)
+
+
+def _resolve_approved_actors(clerk_user_ids: set[str], db: Session) -> dict[str, CachedActor]:
+    actors: dict[str, CachedActor] = {}
+    generations: dict[str, int] = {}
+    for clerk_user_id in clerk_user_ids:
+        actor, generation = actor_cache.lookup(clerk_user_id)
+        if actor is not None:
+            actors[clerk_user_id] = actor
+        else:
+            generations[clerk_user_id] = generation
+
+    if generations:
+        users = db.scalars(
+            select(AccessUser).where(
+                AccessUser.clerk_user_id.in_(generations),
+                AccessUser.status == AccessStatus.approved.value,
+            )
+        ).all()
+        for user in users:
+            actor = CachedActor.from_user(user)
+            actor_cache.store(user.clerk_user_id, actor, generations[user.clerk_user_id])
+            actors[user.clerk_user_id] = actor
+    return actors
+
+
+def check_permissions(payload: PermissionCheckRequest, db: Session) -> PermissionCheckResponse:
+    actor_ids = [check.actor_clerk_user_id or payload.actor_clerk_user_id for check in payload.checks]
+    actors = _resolve_approved_actors({actor_id for actor_id in actor_ids if actor_id}, db)
+
+    results = []
+    for actor_id, check in zip(actor_ids, payload.checks):
+        actor = actors.get(actor_id) if actor_id else None
+        permissions = (
+            PERMISSION_SETS_BY_ROLE[AccessRole(actor.approved_role)]
+            if actor is not None and actor.approved_role
+            else frozenset()
+        )
+        results.append(
+            PermissionCheckResult(
+                actor_clerk_user_id=actor_id,
+                permission=check.permission,
+                allowed=check.permission in permissions,
+            )
+        )
+    return PermissionCheckResponse(results=results)
+
+
 def get_pending_users(db: Session) -> list[PendingUserResponse]:
-    users = db.scalars(
-        select(AccessUser)
+    users = db.execute(
+        select(
+            AccessUser.clerk_user_id,
+            AccessUser.email,
+            AccessUser.full_name,
+            AccessUser.requested_role,
+            AccessUser.created_at,
+        )
         .where(AccessUser.status == AccessStatus.pending.value)
         .order_by(AccessUser.created_at.asc())
     ).all()
     return [
-        PendingUserResponse(
+        PendingUserResponse.model_construct(
             clerk_user_id=user.clerk_user_id,
             email=user.email,
             full_name=user.full_name,
@@ -107,9 +350,22 @@ def get_pending_users(db: Session) -> list[PendingUserResponse]:
 
 
 def get_all_users(db: Session) -> list[AdminUserResponse]:
-    users = db.scalars(select(AccessUser).order_by(AccessUser.created_at.desc())).all()
+    users = db.execute(
+        select(
+            AccessUser.clerk_user_id,
+            AccessUser.email,
+            AccessUser.full_name,
+            AccessUser.requested_role,
+            AccessUser.approved_role,
+            AccessUser.status,
+            AccessUser.approved_by,
+            AccessUser.approved_at,
+            AccessUser.created_at,
+            AccessUser.updated_at,
+        ).order_by(AccessUser.created_at.desc())
+    ).all()
     return [
-        AdminUserResponse(
+        AdminUserResponse.model_construct(
             clerk_user_id=user.clerk_user_id,
             email=user.email,
             full_name=user.full_name,
@@ -133,6 +389,7 @@ def create_user_as_admin(
     existing_user = db.scalar(select(AccessUser).where(AccessUser.clerk_user_id == payload.clerk_user_id))
     if existing_user is not None:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
+    ensure_not_pending_deletion(db, [payload.clerk_user_id])
 
     user = AccessUser(
         clerk_user_id=payload.clerk_user_id,
@@ -145,7 +402,13 @@ def create_user_as_admin(
         approved_at=utcnow(),
     )
     db.add(user)
+    db.flush()
+    seed_unread_counters(db, [user.clerk_user_id])
+    admin_delta = int(payload.approved_role == AccessRole.admin)
+    admin_version = _record_user_changes(db, admin_delta)
     db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+    actor_cache.invalidate(user.clerk_user_id)
     db.refresh(user)
     return build_profile(user)
 
@@ -160,6 +423,7 @@ def approve_user(
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    was_approved_admin = _is_approved_admin(user.status, user.approved_role)
     approved_role = payload.approved_role.value if payload.approved_role else user.requested_role
     user.status = AccessStatus.approved.value
     user.approved_role = approved_role
@@ -168,7 +432,11 @@ def approve_user(
     user.rejection_reason = None
     user.updated_at = utcnow()
 
+    admin_delta = int(_is_approved_admin(user.status, user.approved_role)) - int(was_approved_admin)
+    admin_version = _record_user_changes(db, admin_delta)
     db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+    actor_cache.invalidate(user.clerk_user_id)
     db.refresh(user)
     return build_profile(user)
 
@@ -183,6 +451,7 @@ def reject_user(
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    was_approved_admin = _is_approved_admin(user.status, user.approved_role)
     user.status = AccessStatus.rejected.value
     user.approved_role = None
     user.approved_by = actor.clerk_user_id
@@ -190,16 +459,150 @@ def reject_user(
     user.rejection_reason = payload.reason
     user.updated_at = utcnow()
 
+    admin_delta = int(_is_approved_admin(user.status, user.approved_role)) - int(was_approved_admin)
+    admin_version = _record_user_changes(db, admin_delta)
     db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+    actor_cache.invalidate(user.clerk_user_id)
     db.refresh(user)
     return build_profile(user)
 
 
-def delete_user(
-    clerk_user_id: str,
+def approve_users(
+    payload: BulkApproveRequest,
     actor: AccessUser,
     db: Session,
-) -> DeleteUserResponse:
+) -> list[BulkUserActionResult]:
+    roles_by_id = {item.clerk_user_id: item.approved_role for item in payload.items}
+    rows_by_id = _load_user_rows(db, roles_by_id)
+    timestamp = utcnow()
+
+    admin_delta = 0
+    outcomes: dict[str, BulkActionOutcome] = {}
+    ids_by_role: dict[str, list[str]] = {}
+    for clerk_user_id, requested in roles_by_id.items():
+        row = rows_by_id.get(clerk_user_id)
+        if row is None:
+            outcomes[clerk_user_id] = BulkActionOutcome.not_found
+            continue
+
+        approved_role = requested.value if requested else row["requested_role"]
+        if row["status"] == AccessStatus.approved.value and row["approved_role"] == approved_role:
+            outcomes[clerk_user_id] = BulkActionOutcome.already_approved
+            continue
+
+        admin_delta -= int(_is_approved_admin(row["status"], row["approved_role"]))
+        admin_delta += int(approved_role == AccessRole.admin.value)
+        row.update(
+            status=AccessStatus.approved.value,
+            approved_role=approved_role,
+            approved_by=actor.clerk_user_id,
+            approved_at=timestamp,
+            rejection_reason=None,
+            updated_at=timestamp,
+        )
+        outcomes[clerk_user_id] = BulkActionOutcome.approved
+        ids_by_role.setdefault(approved_role, []).append(clerk_user_id)
+
+    for approved_role, clerk_user_ids in ids_by_role.items():
+        db.execute(
+            update(AccessUser)
+            .where(AccessUser.clerk_user_id.in_(clerk_user_ids))
+            .values(
+                status=AccessStatus.approved.value,
+                approved_role=approved_role,
+                approved_by=actor.clerk_user_id,
+                approved_at=timestamp,
+                rejection_reason=None,
+                updated_at=timestamp,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    admin_version = _record_user_changes(db, admin_delta) if ids_by_role else None
+    db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+
+    return _bulk_results(roles_by_id, outcomes, rows_by_id, db)
+
+
+def reject_users(
+    payload: BulkRejectRequest,
+    actor: AccessUser,
+    db: Session,
+) -> list[BulkUserActionResult]:
+    reasons_by_id = {item.clerk_user_id: item.reason for item in payload.items}
+    rows_by_id = _load_user_rows(db, reasons_by_id)
+    timestamp = utcnow()
+
+    admin_delta = 0
+    outcomes: dict[str, BulkActionOutcome] = {}
+    ids_by_reason: dict[Optional[str], list[str]] = {}
+    for clerk_user_id, reason in reasons_by_id.items():
+        row = rows_by_id.get(clerk_user_id)
+        if row is None:
+            outcomes[clerk_user_id] = BulkActionOutcome.not_found
+            continue
+
+        if row["status"] == AccessStatus.rejected.value and row["rejection_reason"] == reason:
+            outcomes[clerk_user_id] = BulkActionOutcome.already_rejected
+            continue
+
+        admin_delta -= int(_is_approved_admin(row["status"], row["approved_role"]))
+        row.update(
+            status=AccessStatus.rejected.value,
+            approved_role=None,
+            approved_by=actor.clerk_user_id,
+            approved_at=timestamp,
+            rejection_reason=reason,
+            updated_at=timestamp,
+        )
+        outcomes[clerk_user_id] = BulkActionOutcome.rejected
+        ids_by_reason.setdefault(reason, []).append(clerk_user_id)
+
+    for reason, clerk_user_ids in ids_by_reason.items():
+        db.execute(
+            update(AccessUser)
+            .where(AccessUser.clerk_user_id.in_(clerk_user_ids))
+            .values(
+                status=AccessStatus.rejected.value,
+                approved_role=None,
+                approved_by=actor.clerk_user_id,
+                approved_at=timestamp,
+                rejection_reason=reason,
+                updated_at=timestamp,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    admin_version = _record_user_changes(db, admin_delta) if ids_by_reason else None
+    db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+
+    return _bulk_results(reasons_by_id, outcomes, rows_by_id, db)
+
+
+def _bulk_results(
+    clerk_user_ids: Iterable[str],
+    outcomes: dict[str, BulkActionOutcome],
+    rows_by_id: dict[str, dict[str, Any]],
+    db: Session,
+) -> list[BulkUserActionResult]:
+    results = []
+    for clerk_user_id in clerk_user_ids:
+        outcome = outcomes[clerk_user_id]
+        if outcome in {BulkActionOutcome.approved, BulkActionOutcome.rejected}:
+            actor_cache.invalidate(clerk_user_id)
+        row = rows_by_id.get(clerk_user_id)
+        results.append(
+            BulkUserActionResult(
+                clerk_user_id=clerk_user_id,
+                outcome=outcome,
+                profile=build_profile(_as_stored_user(db, row)) if row is not None else None,
+            )
+        )
+    return results
+
+
+def _load_deletable_user(clerk_user_id: str, actor: AccessUser, db: Session) -> tuple[AccessUser, bool]:
     user = db.scalar(select(AccessUser).where(AccessUser.clerk_user_id == clerk_user_id))
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -210,23 +613,43 @@ def delete_user(
             detail="Cannot delete your own admin account",
         )
 
-    is_approved_admin = (
-        user.status == AccessStatus.approved.value and user.approved_role == AccessRole.admin.value
-    )
-    if is_approved_admin:
-        approved_admin_count = db.scalar(
-            select(func.count())
-            .select_from(AccessUser)
-            .where(
-                AccessUser.status == AccessStatus.approved.value,
-                AccessUser.approved_role == AccessRole.admin.value,
-            )
+    is_approved_admin = _is_approved_admin(user.status, user.approved_role)
+    if is_approved_admin and approved_admin_count(db) <= 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete the last approved admin",
         )
-        if not approved_admin_count or approved_admin_count <= 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot delete the last approved admin",
-            )
+    return user, is_approved_admin
+
+
+def _remove_user(user: AccessUser, is_approved_admin: bool, db: Session) -> None:
+    clerk_user_id = user.clerk_user_id
+    drop_unread_counter(db, clerk_user_id)
+    db.delete(user)
+    admin_delta = -int(is_approved_admin)
+    admin_version = _record_user_changes(db, admin_delta)
+    db.commit()
+    _apply_admin_change(admin_delta, admin_version)
+    actor_cache.invalidate(clerk_user_id)
+
+
+def delete_user(
+    clerk_user_id: str,
+    actor: AccessUser,
+    db: Session,
+) -> DeleteUserResponse:
+    user, is_approved_admin = _load_deletable_user(clerk_user_id, actor, db)
+
+    unread_by_recipient = db.execute(
+        select(AccessMessage.recipient_clerk_user_id, func.count())
+        .where(
+            AccessMessage.sender_clerk_user_id == clerk_user_id,
+            AccessMessage.recipient_clerk_user_id != clerk_user_id,
+            AccessMessage.read_at.is_(None),
+        )
+        .group_by(AccessMessage.recipient_clerk_user_id)
+    ).all()
+    adjust_unread_counts(db, {recipient_id: -count for recipient_id, count in unread_by_recipient})
 
     deleted_messages = db.execute(
         delete(AccessMessage).where(
@@ -237,10 +660,24 @@ def delete_user(
         )
     ).rowcount
 
-    db.delete(user)
-    db.commit()
+    _remove_user(user, is_approved_admin, db)
 
     return DeleteUserResponse(
         clerk_user_id=clerk_user_id,
         deleted_messages_count=int(deleted_messages or 0),
     )
+
+
+def schedule_user_deletion(
+    clerk_user_id: str,
+    actor: AccessUser,
+    db: Session,
+) -> DeletionJobResponse:
+    user, is_approved_admin = _load_deletable_user(clerk_user_id, actor, db)
+
+    # The user row goes now; their messages are purged in batches by the deletion worker.
+    job = AccessDeletionJob(clerk_user_id=clerk_user_id, requested_by=actor.clerk_user_id)
+    db.add(job)
+    _remove_user(user, is_approved_admin, db)
+    db.refresh(job)
+    return build_deletion_job(job)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Iterable
+from datetime import timedelta
+from typing import Any, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import (
+    ACCESS_DELETION_BATCH_PAUSE_SECONDS,
+    ACCESS_DELETION_BATCH_SIZE,
+    ACCESS_DELETION_POLL_SECONDS,
+)
+from app.constants import DELETION_JOB_STALE_SECONDS, DeletionJobStatus, utcnow
+from app.db import SessionLocal
+from app.models import AccessDeletionJob, AccessMessage
+from app.schemas import DeletionJobResponse
+from app.services.unread_counter import adjust_unread_counts
+
+
+logger = logging.getLogger("app.deletion_jobs")
+
+T = TypeVar("T")
+
+_ACTIVE_STATUSES = (DeletionJobStatus.pending.value, DeletionJobStatus.running.value)
+_wakeup: Optional[asyncio.Event] = None
+
+
+def build_deletion_job(job: AccessDeletionJob) -> DeletionJobResponse:
+    return DeletionJobResponse.model_construct(
+        job_id=job.id,
+        clerk_user_id=job.clerk_user_id,
+        status=DeletionJobStatus(job.status),
+        requested_by=job.requested_by,
+        deleted_messages_count=job.deleted_messages_count,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        completed_at=job.completed_at,
+    )
+
+
+def get_deletion_job(job_id: int, db: Session) -> DeletionJobResponse:
+    job = db.get(AccessDeletionJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion job not found")
+    return build_deletion_job(job)
+
+
+def pending_deletion_ids(db: Session, clerk_user_ids: Iterable[str]) -> set[str]:
+    return set(
+        db.scalars(
+            select(AccessDeletionJob.clerk_user_id).where(
+                AccessDeletionJob.clerk_user_id.in_(set(clerk_user_ids)),
+                AccessDeletionJob.status.in_(_ACTIVE_STATUSES),
+            )
+        )
+    )
+
+
+def ensure_not_pending_deletion(db: Session, clerk_user_ids: Iterable[str]) -> None:
+    pending = pending_deletion_ids(db, clerk_user_ids)
+    if pending:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"User deletion in progress: {', '.join(sorted(pending))}",
+        )
+
+
+def _claimable() -> Any:
+    # A running job that stopped reporting progress belongs to a worker that died or hit an error.
+    stale_before = utcnow() - timedelta(seconds=DELETION_JOB_STALE_SECONDS)
+    return or_(
+        AccessDeletionJob.status == DeletionJobStatus.pending.value,
+        and_(
+            AccessDeletionJob.status == DeletionJobStatus.running.value,
+            AccessDeletionJob.updated_at < stale_before,
+        ),
+    )
+
+
+def claim_deletion_job(db: Session) -> Optional[tuple[int, str]]:
+    candidate = db.execute(
+        select(AccessDeletionJob.id, AccessDeletionJob.clerk_user_id)
+        .where(_claimable())
+        .order_by(AccessDeletionJob.id)
+        .limit(1)
+    ).first()
+    if candidate is None:
+        return None
+
+    claimed = db.execute(
+        update(AccessDeletionJob)
+        .where(AccessDeletionJob.id == candidate.id, _claimable())
+        .values(status=DeletionJobStatus.running.value, updated_at=utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return (candidate.id, candidate.clerk_user_id) if claimed else None
+
+
+def purge_deletion_batch(
+    job_id: int,
+    clerk_user_id: str,
+    db: Session,
+    batch_size: int = ACCESS_DELETION_BATCH_SIZE,
+) -> bool:
+    batch = (
+        select(AccessMessage.id)
+        .where(
+            or_(
+                AccessMessage.sender_clerk_user_id == clerk_user_id,
+                AccessMessage.recipient_clerk_user_id == clerk_user_id,
+            )
+        )
+        .limit(batch_size)
+    )
+    deleted = db.execute(
+        delete(AccessMessage)
+        .where(AccessMessage.id.in_(batch.scalar_subquery()))
+        .returning(AccessMessage.recipient_clerk_user_id, AccessMessage.read_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    unread_deltas: dict[str, int] = {}
+    for recipient_clerk_user_id, read_at in deleted:
+        if recipient_clerk_user_id != clerk_user_id and read_at is None:
+            unread_deltas[recipient_clerk_user_id] = unread_deltas.get(recipient_clerk_user_id, 0) - 1
+    adjust_unread_counts(db, unread_deltas)
+
+    finished = len(deleted) < batch_size
+    timestamp = utcnow()
+    values: dict[str, Any] = {
+        "deleted_messages_count": AccessDeletionJob.deleted_messages_count + len(deleted),
+        "error": None,
+        "updated_at": timestamp,
+    }
+    if finished:
+        values.update(status=DeletionJobStatus.completed.value, completed_at=timestamp)
+    db.execute(
+        update(AccessDeletionJob)
+        .where(AccessDeletionJob.id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return finished
+
+
+def record_deletion_error(job_id: int, error: str, db: Session) -> None:
+    db.execute(
+        update(AccessDeletionJob)
+        .where(AccessDeletionJob.id == job_id)
+        .values(error=error[:500])
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _with_new_session(function: Callable[..., T], *args: Any) -> T:
+    with SessionLocal() as db:
+        return function(*args, db)
+
+
+async def _run_next_deletion_job() -> bool:
+    job = await run_in_threadpool(_with_new_session, claim_deletion_job)
+    if job is None:
+        return False
+
+    job_id, clerk_user_id = job
+    try:
+        while not await run_in_threadpool(_with_new_session, purge_deletion_batch, job_id, clerk_user_id):
+            await asyncio.sleep(ACCESS_DELETION_BATCH_PAUSE_SECONDS)
+    except Exception as exc:
+        logger.exception("Deletion job %s failed", job_id)
+        await run_in_threadpool(_with_new_session, record_deletion_error, job_id, repr(exc))
+        return False
+    return True
+
+
+def notify_deletion_worker() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def run_deletion_worker() -> None:
+    global _wakeup
+    wakeup = _wakeup = asyncio.Event()
+    while True:
+        try:
+            processed = await _run_next_deletion_job()
+        except Exception:
+            logger.exception("Deletion worker failed to claim a job")
+            processed = False
+        if processed:
+            continue
+        try:
+            await asyncio.wait_for(wakeup.wait(), ACCESS_DELETION_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+
+
+async def stop_deletion_worker(task: asyncio.Task[None]) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping
+from datetime import datetime
+from typing import Any, Union
+
+from sqlalchemy import Select, or_, select
+
+from app.config import ACCESS_DB_ASYNC
+from app.constants import EXPORT_CHUNK_SIZE
+from app.db import AsyncSessionLocal, SessionLocal
+from app.models import AccessMessage, AccessUser
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _encode_rows(rows: Iterable[Mapping[str, Any]]) -> str:
+    return "".join(json.dumps(dict(row), default=_json_default, separators=(",", ":")) + "\n" for row in rows)
+
+
+def _stream_sync(statement: Select[Any]) -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        for partition in result.mappings().partitions():
+            yield _encode_rows(partition)
+    finally:
+        db.close()
+
+
+async def _stream_async(statement: Select[Any]) -> AsyncIterator[str]:
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for partition in result.mappings().partitions():
+            yield _encode_rows(partition)
+
+
+def stream_ndjson(statement: Select[Any]) -> Union[Iterator[str], AsyncIterator[str]]:
+    return _stream_async(statement) if ACCESS_DB_ASYNC else _stream_sync(statement)
+
+
+def export_users_statement() -> Select[Any]:
+    return select(
+        AccessUser.clerk_user_id,
+        AccessUser.email,
+        AccessUser.full_name,
+        AccessUser.requested_role,
+        AccessUser.approved_role,
+        AccessUser.status,
+        AccessUser.approved_by,
+        AccessUser.approved_at,
+        AccessUser.rejection_reason,
+        AccessUser.created_at,
+        AccessUser.updated_at,
+    ).order_by(AccessUser.id.asc())
+
+
+def export_user_messages_statement(clerk_user_id: str) -> Select[Any]:
+    return (
+        select(
+            AccessMessage.id,
+            AccessMessage.sender_clerk_user_id,
+            AccessMessage.recipient_clerk_user_id,
+            AccessMessage.subject,
+            AccessMessage.body,
+            AccessMessage.reply_to_message_id,
+            AccessMessage.read_at,
+            AccessMessage.created_at,
+        )
+        .where(
+            or_(
+                AccessMessage.sender_clerk_user_id == clerk_user_id,
+                AccessMessage.recipient_clerk_user_id == clerk_user_id,
+            )
+        )
+        .order_by(AccessMessage.id.asc())
+    )
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import AccessGeneration
+
+
+APPROVED_ADMINS = "approved_admins"
+ACCESS_USERS = "access_users"
+
+
+def get_generation(db: Session, name: str) -> int:
+    value = db.scalar(select(AccessGeneration.value).where(AccessGeneration.name == name))
+    return int(value or 0)
+
+
+def bump_generations(db: Session, names: Iterable[str]) -> dict[str, int]:
+    names = set(names)
+    values = dict(
+        db.execute(
+            update(AccessGeneration)
+            .where(AccessGeneration.name.in_(names))
+            .values(value=AccessGeneration.value + 1)
+            .returning(AccessGeneration.name, AccessGeneration.value)
+            .execution_options(synchronize_session=False)
+        ).all()
+    )
+    missing = names - set(values)
+    if missing:
+        raise RuntimeError(f"Missing generation rows {sorted(missing)}. Run `python -m app.cli migrate`.")
+    return values
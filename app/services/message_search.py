@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import Select, column, func, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection
+
+from app.models import AccessMessage
+
+
+FTS_TABLE = "access_messages_fts"
+
+_SQLITE_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS access_messages_fts_insert AFTER INSERT ON access_messages BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, subject, body) VALUES (new.id, new.subject, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS access_messages_fts_delete AFTER DELETE ON access_messages BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, body) VALUES ('delete', old.id, old.subject, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS access_messages_fts_update AFTER UPDATE OF subject, body ON access_messages BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, body) VALUES ('delete', old.id, old.subject, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, subject, body) VALUES (new.id, new.subject, new.body);
+    END
+    """,
+)
+
+_fts = table(FTS_TABLE, column("rowid"), column("subject"), column("body"))
+
+
+def _postgresql_document() -> Any:
+    return func.to_tsvector(
+        literal_column("'simple'"),
+        AccessMessage.subject + literal_column("' '") + AccessMessage.body,
+    )
+
+
+def install_message_search(connection: Connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.scalar(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        )
+        if not exists:
+            connection.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "subject, body, content='access_messages', content_rowid='id')"
+            )
+            connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        for statement in _SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+    elif dialect == "postgresql":
+        connection.exec_driver_sql(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_access_messages_fts ON access_messages "
+            "USING GIN (to_tsvector('simple', subject || ' ' || body))"
+        )
+
+
+def _sqlite_match_expression(query: str) -> str:
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    return " ".join(terms)
+
+
+def build_search_statement(dialect: str, query: str, clerk_user_id: str) -> Optional[Select[Any]]:
+    is_party = or_(
+        AccessMessage.sender_clerk_user_id == clerk_user_id,
+        AccessMessage.recipient_clerk_user_id == clerk_user_id,
+    )
+    if dialect == "sqlite":
+        rank = func.bm25(literal_column(FTS_TABLE))
+        return (
+            select(AccessMessage)
+            .join(_fts, _fts.c.rowid == AccessMessage.id)
+            .where(literal_column(FTS_TABLE).op("MATCH")(_sqlite_match_expression(query)), is_party)
+            .order_by(rank.asc(), AccessMessage.id.desc())
+        )
+    if dialect == "postgresql":
+        ts_query = func.plainto_tsquery(literal_column("'simple'"), query)
+        document = _postgresql_document()
+        return (
+            select(AccessMessage)
+            .where(document.op("@@")(ts_query), is_party)
+            .order_by(func.ts_rank(document, ts_query).desc(), AccessMessage.id.desc())
+        )
+    return None
@@ -1,14 +1,46 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import base64
+import binascii
+import logging
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Any, Optional, TypeVar
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased
 
-from app.constants import AccessStatus, utcnow
+from app.constants import AccessRole, AccessStatus, MESSAGE_PREVIEW_LENGTH, MESSAGES_PAGE_DEFAULT_LIMIT, utcnow
+from app.db import as_stored
 from app.models import AccessMessage, AccessUser
-from app.schemas import MessageResponse, MessagingUserResponse, SendMessageRequest
+from app.schemas import (
+    BroadcastMessageRequest,
+    BroadcastMessageResponse,
+    MessagePageResponse,
+    MessageResponse,
+    MessageSummaryPageResponse,
+    MessageSummaryResponse,
+    MessagingUserResponse,
+    SendMessageRequest,
+)
+from app.services.message_search import build_search_statement
+from app.services.notification_hub import notification_hub
+from app.services.read_receipts import (
+    apply_read_receipts,
+    flush_read_receipts,
+    publish_unread_count,
+    publish_unread_counts,
+    read_receipt_buffer,
+    unread_count,
+)
+from app.services.unread_counter import adjust_unread_count, adjust_unread_counts
+
+
+logger = logging.getLogger("app.messaging_service")
+
+T = TypeVar("T")
 
 
 def _index_users_by_clerk_id(users: Iterable[AccessUser]) -> dict[str, AccessUser]:
@@ -18,7 +50,7 @@ def _index_users_by_clerk_id(users: Iterable[AccessUser]) -> dict[str, AccessUse
 def _to_message_response(message: AccessMessage, users_by_id: dict[str, AccessUser]) -> MessageResponse:
     sender = users_by_id.get(message.sender_clerk_user_id)
     recipient = users_by_id.get(message.recipient_clerk_user_id)
-    return MessageResponse(
+    return MessageResponse.model_construct(
         id=message.id,
         sender_clerk_user_id=message.sender_clerk_user_id,
         sender_email=sender.email if sender else None,
@@ -34,14 +66,128 @@ def _to_message_response(message: AccessMessage, users_by_id: dict[str, AccessUs
     )
 
 
+_sender = aliased(AccessUser, name="sender")
+_recipient = aliased(AccessUser, name="recipient")
+
+_MESSAGE_COLUMNS = (
+    AccessMessage.id,
+    AccessMessage.sender_clerk_user_id,
+    _sender.email.label("sender_email"),
+    _sender.full_name.label("sender_full_name"),
+    AccessMessage.recipient_clerk_user_id,
+    _recipient.email.label("recipient_email"),
+    _recipient.full_name.label("recipient_full_name"),
+    AccessMessage.subject,
+    AccessMessage.reply_to_message_id,
+    AccessMessage.read_at,
+    AccessMessage.created_at,
+)
+
+
+def _with_parties(statement: Select[Any]) -> Select[Any]:
+    return statement.outerjoin(_sender, _sender.clerk_user_id == AccessMessage.sender_clerk_user_id).outerjoin(
+        _recipient, _recipient.clerk_user_id == AccessMessage.recipient_clerk_user_id
+    )
+
+
+def _message_rows_statement(*criteria: Any) -> Select[Any]:
+    return _with_parties(select(*_MESSAGE_COLUMNS, AccessMessage.body)).where(*criteria)
+
+
+def _row_to_message_response(row: Row[Any]) -> MessageResponse:
+    return MessageResponse.model_construct(**row._asdict())
+
+
+def _find_message_row(message_id: int, db: Session) -> Row[Any]:
+    row = db.execute(_message_rows_statement(AccessMessage.id == message_id)).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
+    return row
+
+
+def _encode_cursor(message: AccessMessage) -> str:
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, message_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+
+
+def _encode_offset_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset|{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_offset_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, offset = raw.split("|", 1)
+        if prefix != "offset" or int(offset) < 0:
+            raise ValueError(raw)
+        return int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+
+
+def _page_statement(statement: Select[Any], cursor: Optional[str], limit: int) -> Select[Any]:
+    if cursor is not None:
+        created_at, message_id = _decode_cursor(cursor)
+        statement = statement.where(tuple_(AccessMessage.created_at, AccessMessage.id) < tuple_(created_at, message_id))
+    return statement.order_by(AccessMessage.created_at.desc(), AccessMessage.id.desc()).limit(limit + 1)
+
+
+def _split_page(rows: Sequence[T], limit: int) -> tuple[list[T], Optional[str]]:
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, _encode_cursor(page[-1])
+
+
+def _fetch_message_page(
+    statement: Select[Any],
+    cursor: Optional[str],
+    limit: int,
+    db: Session,
+) -> MessagePageResponse:
+    rows, next_cursor = _split_page(db.execute(_page_statement(statement, cursor, limit)).all(), limit)
+    return MessagePageResponse.model_construct(
+        items=[_row_to_message_response(row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+def _fetch_summary_page(
+    direction_filter: Any,
+    cursor: Optional[str],
+    limit: int,
+    db: Session,
+) -> MessageSummaryPageResponse:
+    statement = _with_parties(
+        select(
+            *_MESSAGE_COLUMNS,
+            func.substr(AccessMessage.body, 1, MESSAGE_PREVIEW_LENGTH).label("body_preview"),
+        )
+    ).where(direction_filter)
+    rows, next_cursor = _split_page(db.execute(_page_statement(statement, cursor, limit)).all(), limit)
+    return MessageSummaryPageResponse.model_construct(
+        items=[MessageSummaryResponse.model_construct(**row._asdict()) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
 def list_organization_users(actor: AccessUser, db: Session) -> list[MessagingUserResponse]:
-    users = db.scalars(
-        select(AccessUser)
+    users = db.execute(
+        select(AccessUser.clerk_user_id, AccessUser.email, AccessUser.full_name)
         .where(AccessUser.status == AccessStatus.approved.value)
         .order_by(AccessUser.full_name.asc(), AccessUser.email.asc())
     ).all()
     return [
-        MessagingUserResponse(
+        MessagingUserResponse.model_construct(
             clerk_user_id=user.clerk_user_id,
             email=user.email,
             full_name=user.full_name,
@@ -89,82 +235,296 @@ def send_message(payload: SendMessageRequest, actor: AccessUser, db: Session) ->
         reply_to_message_id=payload.reply_to_message_id,
     )
     db.add(message)
+    db.flush()
+    adjust_unread_count(db, recipient.clerk_user_id, 1)
     db.commit()
     db.refresh(message)
 
     users_by_id = _index_users_by_clerk_id([actor, recipient])
-    return _to_message_response(message, users_by_id)
+    response = _to_message_response(message, users_by_id)
+    if notification_hub.has_subscribers(recipient.clerk_user_id):
+        notification_hub.publish(recipient.clerk_user_id, "message", response.model_dump(mode="json"))
+        publish_unread_count(db, recipient.clerk_user_id)
+    return response
 
 
-def list_inbox_messages(actor: AccessUser, db: Session) -> list[MessageResponse]:
-    messages = db.scalars(
-        select(AccessMessage)
-        .where(AccessMessage.recipient_clerk_user_id == actor.clerk_user_id)
-        .order_by(AccessMessage.created_at.desc())
-    ).all()
-    user_ids = {actor.clerk_user_id}
-    user_ids.update(message.sender_clerk_user_id for message in messages)
-    users = db.scalars(select(AccessUser).where(AccessUser.clerk_user_id.in_(user_ids))).all()
-    users_by_id = _index_users_by_clerk_id(users)
-    return [_to_message_response(message, users_by_id) for message in messages]
-
-
-def list_sent_messages(actor: AccessUser, db: Session) -> list[MessageResponse]:
-    messages = db.scalars(
-        select(AccessMessage)
-        .where(AccessMessage.sender_clerk_user_id == actor.clerk_user_id)
-        .order_by(AccessMessage.created_at.desc())
+def broadcast_message(
+    payload: BroadcastMessageRequest,
+    actor: AccessUser,
+    db: Session,
+) -> BroadcastMessageResponse:
+    if payload.recipient_clerk_user_ids is None and actor.approved_role != AccessRole.admin.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only approved admins can broadcast to a role or to every user",
+        )
+
+    subject = payload.subject.strip()
+    body = payload.body.strip()
+    if not subject or not body:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Subject and body are required")
+
+    statement = select(AccessUser.clerk_user_id, AccessUser.email, AccessUser.full_name).where(
+        AccessUser.status == AccessStatus.approved.value,
+        AccessUser.clerk_user_id != actor.clerk_user_id,
+    )
+    if payload.recipient_clerk_user_ids is not None:
+        statement = statement.where(AccessUser.clerk_user_id.in_(set(payload.recipient_clerk_user_ids)))
+    if payload.approved_role is not None:
+        statement = statement.where(AccessUser.approved_role == payload.approved_role.value)
+    recipients = db.execute(statement.order_by(AccessUser.clerk_user_id.asc())).all()
+    if not recipients:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No recipients found")
+
+    timestamp = utcnow()
+    inserted = db.execute(
+        insert(AccessMessage).returning(
+            AccessMessage.id,
+            AccessMessage.recipient_clerk_user_id,
+            AccessMessage.created_at,
+        ),
+        [
+            {
+                "sender_clerk_user_id": actor.clerk_user_id,
+                "recipient_clerk_user_id": recipient.clerk_user_id,
+                "subject": subject,
+                "body": body,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            }
+            for recipient in recipients
+        ],
     ).all()
-    user_ids = {actor.clerk_user_id}
-    user_ids.update(message.recipient_clerk_user_id for message in messages)
-    users = db.scalars(select(AccessUser).where(AccessUser.clerk_user_id.in_(user_ids))).all()
-    users_by_id = _index_users_by_clerk_id(users)
-    return [_to_message_response(message, users_by_id) for message in messages]
+    adjust_unread_counts(db, {recipient.clerk_user_id: 1 for recipient in recipients})
+    db.commit()
+
+    recipients_by_id = {recipient.clerk_user_id: recipient for recipient in recipients}
+    for row in inserted:
+        if not notification_hub.has_subscribers(row.recipient_clerk_user_id):
+            continue
+        recipient = recipients_by_id[row.recipient_clerk_user_id]
+        response = MessageResponse.model_construct(
+            id=row.id,
+            sender_clerk_user_id=actor.clerk_user_id,
+            sender_email=actor.email,
+            sender_full_name=actor.full_name,
+            recipient_clerk_user_id=recipient.clerk_user_id,
+            recipient_email=recipient.email,
+            recipient_full_name=recipient.full_name,
+            subject=subject,
+            body=body,
+            reply_to_message_id=None,
+            read_at=None,
+            created_at=row.created_at,
+        )
+        notification_hub.publish(recipient.clerk_user_id, "message", response.model_dump(mode="json"))
+    publish_unread_counts(db, recipients_by_id)
+
+    return BroadcastMessageResponse(
+        sent_count=len(inserted),
+        recipient_clerk_user_ids=[recipient.clerk_user_id for recipient in recipients],
+    )
+
+
+def list_inbox_messages(
+    actor: AccessUser,
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = MESSAGES_PAGE_DEFAULT_LIMIT,
+) -> MessagePageResponse:
+    return _fetch_message_page(
+        _message_rows_statement(AccessMessage.recipient_clerk_user_id == actor.clerk_user_id),
+        cursor,
+        limit,
+        db,
+    )
+
+
+def list_inbox_summaries(
+    actor: AccessUser,
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = MESSAGES_PAGE_DEFAULT_LIMIT,
+) -> MessageSummaryPageResponse:
+    return _fetch_summary_page(AccessMessage.recipient_clerk_user_id == actor.clerk_user_id, cursor, limit, db)
+
+
+def list_sent_messages(
+    actor: AccessUser,
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = MESSAGES_PAGE_DEFAULT_LIMIT,
+) -> MessagePageResponse:
+    return _fetch_message_page(
+        _message_rows_statement(AccessMessage.sender_clerk_user_id == actor.clerk_user_id),
+        cursor,
+        limit,
+        db,
+    )
+
+
+def list_sent_summaries(
+    actor: AccessUser,
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = MESSAGES_PAGE_DEFAULT_LIMIT,
+) -> MessageSummaryPageResponse:
+    return _fetch_summary_page(AccessMessage.sender_clerk_user_id == actor.clerk_user_id, cursor, limit, db)
+
+
+def get_message(message_id: int, actor: AccessUser, db: Session) -> MessageResponse:
+    row = _find_message_row(message_id, db)
+    if actor.clerk_user_id not in {row.sender_clerk_user_id, row.recipient_clerk_user_id}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot read this message")
+    return _row_to_message_response(row)
 
 
 def mark_message_as_read(message_id: int, actor: AccessUser, db: Session) -> MessageResponse:
-    message = db.scalar(select(AccessMessage).where(AccessMessage.id == message_id))
-    if message is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
-    if message.recipient_clerk_user_id != actor.clerk_user_id:
+    row = _find_message_row(message_id, db)
+    if row.recipient_clerk_user_id != actor.clerk_user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot update this message")
+    if row.read_at is not None:
+        return _row_to_message_response(row)
 
-    if message.read_at is None:
-        message.read_at = utcnow()
-        message.updated_at = utcnow()
-        db.commit()
-        db.refresh(message)
+    if read_receipt_buffer.enabled:
+        read_at, should_flush = read_receipt_buffer.add(actor.clerk_user_id, message_id)
+        if should_flush:
+            try:
+                flush_read_receipts(db)
+            except Exception:
+                # The receipts went back to the buffer; the periodic flusher retries them.
+                logger.exception("Inline read receipt flush failed")
+        else:
+            publish_unread_count(db, actor.clerk_user_id)
+        return MessageResponse.model_construct(**{**row._asdict(), "read_at": as_stored(db, AccessMessage.read_at, read_at)})
 
-    users = db.scalars(
-        select(AccessUser).where(
-            AccessUser.clerk_user_id.in_([message.sender_clerk_user_id, message.recipient_clerk_user_id])
+    timestamp = utcnow()
+    read_at = db.scalar(
+        update(AccessMessage)
+        .where(AccessMessage.id == message_id, AccessMessage.read_at.is_(None))
+        .values(read_at=timestamp, updated_at=timestamp)
+        .returning(AccessMessage.read_at)
+    )
+    if read_at is None:
+        db.rollback()
+        return _row_to_message_response(_find_message_row(message_id, db))
+    adjust_unread_count(db, actor.clerk_user_id, -1)
+    db.commit()
+    publish_unread_count(db, actor.clerk_user_id)
+    return MessageResponse.model_construct(**{**row._asdict(), "read_at": read_at})
+
+
+def search_messages(
+    query: str,
+    actor: AccessUser,
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = MESSAGES_PAGE_DEFAULT_LIMIT,
+) -> MessagePageResponse:
+    if not query.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search query cannot be blank")
+
+    statement = build_search_statement(db.get_bind().dialect.name, query, actor.clerk_user_id)
+    if statement is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Full-text search is not available for this database",
         )
-    ).all()
-    users_by_id = _index_users_by_clerk_id(users)
-    return _to_message_response(message, users_by_id)
 
+    offset = _decode_offset_cursor(cursor) if cursor is not None else 0
+    statement = _with_parties(statement.with_only_columns(*_MESSAGE_COLUMNS, AccessMessage.body))
+    rows = db.execute(statement.offset(offset).limit(limit + 1)).all()
+    next_cursor = _encode_offset_cursor(offset + limit) if len(rows) > limit else None
+    return MessagePageResponse.model_construct(
+        items=[_row_to_message_response(row) for row in rows[:limit]],
+        next_cursor=next_cursor,
+    )
 
-def get_unread_messages_count(actor: AccessUser, db: Session) -> int:
-    count = db.scalar(
-        select(func.count())
-        .select_from(AccessMessage)
-        .where(
-            AccessMessage.recipient_clerk_user_id == actor.clerk_user_id,
-            AccessMessage.read_at.is_(None),
+
+def get_message_thread(message_id: int, actor: AccessUser, db: Session) -> list[MessageResponse]:
+    parties = db.execute(
+        select(AccessMessage.sender_clerk_user_id, AccessMessage.recipient_clerk_user_id).where(
+            AccessMessage.id == message_id
         )
+    ).first()
+    if parties is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
+    if actor.clerk_user_id not in parties:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot read this conversation")
+
+    ancestors = (
+        select(AccessMessage.id, AccessMessage.reply_to_message_id, literal(0).label("depth"))
+        .where(AccessMessage.id == message_id)
+        .cte("ancestors", recursive=True)
     )
-    return int(count or 0)
+    ancestors = ancestors.union_all(
+        select(AccessMessage.id, AccessMessage.reply_to_message_id, ancestors.c.depth + 1).join(
+            ancestors, AccessMessage.id == ancestors.c.reply_to_message_id
+        )
+    )
+    root_id = select(ancestors.c.id).order_by(ancestors.c.depth.desc()).limit(1).scalar_subquery()
+
+    thread = select(AccessMessage.id).where(AccessMessage.id == root_id).cte("thread", recursive=True)
+    thread = thread.union_all(
+        select(AccessMessage.id).join(thread, AccessMessage.reply_to_message_id == thread.c.id)
+    )
+    rows = db.execute(
+        _message_rows_statement()
+        .join(thread, AccessMessage.id == thread.c.id)
+        .where(
+            or_(
+                AccessMessage.sender_clerk_user_id == actor.clerk_user_id,
+                AccessMessage.recipient_clerk_user_id == actor.clerk_user_id,
+            )
+        )
+        .order_by(AccessMessage.created_at.asc(), AccessMessage.id.asc())
+    ).all()
+    return [_row_to_message_response(row) for row in rows]
+
+
+def get_unread_messages_count(actor: AccessUser, db: Session) -> int:
+    return unread_count(db, actor.clerk_user_id)
+
+
+def mark_messages_as_read(message_ids: list[int], actor: AccessUser, db: Session) -> list[int]:
+    timestamp = utcnow()
+    receipts = {message_id: timestamp for message_id in message_ids}
+    # Apply this reader's buffered receipts in the same statement so they are never counted twice.
+    drained = read_receipt_buffer.drain(actor.clerk_user_id)
+    for pending in drained.values():
+        receipts = {**pending, **receipts}
+    try:
+        updated = apply_read_receipts(db, receipts, actor.clerk_user_id).get(actor.clerk_user_id, [])
+        db.commit()
+    except Exception:
+        db.rollback()
+        read_receipt_buffer.restore(drained)
+        raise
+    if updated:
+        publish_unread_count(db, actor.clerk_user_id)
+    requested = set(message_ids)
+    return sorted(message_id for message_id in updated if message_id in requested)
 
 
 def mark_all_messages_as_read(actor: AccessUser, db: Session) -> int:
+    drained = read_receipt_buffer.drain(actor.clerk_user_id)
     timestamp = utcnow()
-    result = db.execute(
-        update(AccessMessage)
-        .where(
-            AccessMessage.recipient_clerk_user_id == actor.clerk_user_id,
-            AccessMessage.read_at.is_(None),
+    try:
+        result = db.execute(
+            update(AccessMessage)
+            .where(
+                AccessMessage.recipient_clerk_user_id == actor.clerk_user_id,
+                AccessMessage.read_at.is_(None),
+            )
+            .values(read_at=timestamp, updated_at=timestamp)
         )
-        .values(read_at=timestamp, updated_at=timestamp)
-    )
-    db.commit()
-    return int(result.rowcount or 0)
+        updated_count = int(result.rowcount or 0)
+        adjust_unread_count(db, actor.clerk_user_id, -updated_count)
+        db.commit()
+    except Exception:
+        db.rollback()
+        read_receipt_buffer.restore(drained)
+        raise
+    if updated_count:
+        publish_unread_count(db, actor.clerk_user_id)
+    return updated_count
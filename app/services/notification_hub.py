@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from starlette.requests import Request
+
+from app.config import ACCESS_STREAM_KEEPALIVE_SECONDS, ACCESS_STREAM_QUEUE_SIZE
+
+
+@dataclass(eq=False)
+class Subscription:
+    clerk_user_id: str
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[tuple[str, dict[str, Any]]] = field(
+        default_factory=lambda: asyncio.Queue(maxsize=ACCESS_STREAM_QUEUE_SIZE)
+    )
+
+
+def _offer(queue: asyncio.Queue[tuple[str, dict[str, Any]]], item: tuple[str, dict[str, Any]]) -> None:
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        # Slow consumer: drop the event, the next unread_count event resynchronizes the client.
+        pass
+
+
+class NotificationHub:
+    def __init__(self) -> None:
+        self._subscriptions: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, clerk_user_id: str) -> Subscription:
+        subscription = Subscription(clerk_user_id=clerk_user_id, loop=asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(clerk_user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.clerk_user_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.clerk_user_id]
+
+    def has_subscribers(self, clerk_user_id: str) -> bool:
+        return clerk_user_id in self._subscriptions
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, clerk_user_id: str, event: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(clerk_user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(_offer, subscription.queue, (event, data))
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def stream_events(
+    request: Request,
+    subscription: Subscription,
+    initial_events: list[tuple[str, dict[str, Any]]],
+) -> AsyncIterator[str]:
+    try:
+        for event, data in initial_events:
+            yield format_sse(event, data)
+        while not await request.is_disconnected():
+            try:
+                event, data = await asyncio.wait_for(subscription.queue.get(), timeout=ACCESS_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event, data)
+    finally:
+        notification_hub.unsubscribe(subscription)
+
+
+notification_hub = NotificationHub()
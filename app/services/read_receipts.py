@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from app.config import (
+    ACCESS_READ_RECEIPT_BUFFER_ENABLED,
+    ACCESS_READ_RECEIPT_FLUSH_SECONDS,
+    ACCESS_READ_RECEIPT_FLUSH_SIZE,
+)
+from app.constants import utcnow
+from app.db import SessionLocal
+from app.models import AccessMessage
+from app.services.notification_hub import notification_hub
+from app.services.unread_counter import adjust_unread_counts, get_unread_count, get_unread_counts
+
+
+logger = logging.getLogger("app.read_receipts")
+
+class ReadReceiptBuffer:
+    def __init__(self, enabled: bool, flush_size: int) -> None:
+        self.enabled = enabled
+        self.flush_size = flush_size
+        self._pending: dict[str, dict[int, datetime]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def add(self, clerk_user_id: str, message_id: int) -> tuple[datetime, bool]:
+        with self._lock:
+            receipts = self._pending.setdefault(clerk_user_id, {})
+            read_at = receipts.get(message_id)
+            if read_at is None:
+                read_at = receipts[message_id] = utcnow()
+                self._size += 1
+            return read_at, self._size >= self.flush_size
+
+    def pending_count(self, clerk_user_id: str) -> int:
+        with self._lock:
+            return len(self._pending.get(clerk_user_id, ()))
+
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def drain(self, clerk_user_id: Optional[str] = None) -> dict[str, dict[int, datetime]]:
+        with self._lock:
+            if clerk_user_id is None:
+                drained, self._pending, self._size = self._pending, {}, 0
+                return drained
+            receipts = self._pending.pop(clerk_user_id, None)
+            if receipts is None:
+                return {}
+            self._size -= len(receipts)
+            return {clerk_user_id: receipts}
+
+    def restore(self, drained: Mapping[str, Mapping[int, datetime]]) -> None:
+        with self._lock:
+            for clerk_user_id, receipts in drained.items():
+                pending = self._pending.setdefault(clerk_user_id, {})
+                for message_id, read_at in receipts.items():
+                    if message_id not in pending:
+                        pending[message_id] = read_at
+                        self._size += 1
+
+
+read_receipt_buffer = ReadReceiptBuffer(
+    enabled=ACCESS_READ_RECEIPT_BUFFER_ENABLED,
+    flush_size=ACCESS_READ_RECEIPT_FLUSH_SIZE,
+)
+
+
+def unread_count(db: Session, clerk_user_id: str) -> int:
+    # Buffered receipts only ever cover messages that were unread when queued.
+    return max(0, get_unread_count(db, clerk_user_id) - read_receipt_buffer.pending_count(clerk_user_id))
+
+
+def publish_unread_count(db: Session, clerk_user_id: str) -> None:
+    if notification_hub.has_subscribers(clerk_user_id):
+        notification_hub.publish(clerk_user_id, "unread_count", {"count": unread_count(db, clerk_user_id)})
+
+
+def publish_unread_counts(db: Session, clerk_user_ids: Iterable[str]) -> None:
+    subscribed = [clerk_user_id for clerk_user_id in clerk_user_ids if notification_hub.has_subscribers(clerk_user_id)]
+    for clerk_user_id, count in get_unread_counts(db, subscribed).items():
+        count = max(0, count - read_receipt_buffer.pending_count(clerk_user_id))
+        notification_hub.publish(clerk_user_id, "unread_count", {"count": count})
+
+
+def apply_read_receipts(
+    db: Session,
+    receipts: Mapping[int, datetime],
+    recipient_clerk_user_id: Optional[str] = None,
+) -> dict[str, list[int]]:
+    if not receipts:
+        return {}
+    statement = (
+        update(AccessMessage)
+        .where(AccessMessage.id.in_(list(receipts)), AccessMessage.read_at.is_(None))
+        .values(read_at=case(dict(receipts), value=AccessMessage.id), updated_at=utcnow())
+        .returning(AccessMessage.id, AccessMessage.recipient_clerk_user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if recipient_clerk_user_id is not None:
+        statement = statement.where(AccessMessage.recipient_clerk_user_id == recipient_clerk_user_id)
+
+    updated: dict[str, list[int]] = {}
+    for message_id, recipient in db.execute(statement):
+        updated.setdefault(recipient, []).append(message_id)
+    adjust_unread_counts(db, {recipient: -len(message_ids) for recipient, message_ids in updated.items()})
+    return updated
+
+
+def flush_read_receipts(db: Session) -> int:
+    drained = read_receipt_buffer.drain()
+    receipts: dict[int, datetime] = {}
+    for pending in drained.values():
+        receipts.update(pending)
+    if not receipts:
+        return 0
+    try:
+        updated = apply_read_receipts(db, receipts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        read_receipt_buffer.restore(drained)
+        raise
+    publish_unread_counts(db, drained)
+    return sum(len(message_ids) for message_ids in updated.values())
+
+
+def _flush_with_new_session() -> int:
+    with SessionLocal() as db:
+        return flush_read_receipts(db)
+
+
+async def run_read_receipt_flusher() -> None:
+    while True:
+        await asyncio.sleep(ACCESS_READ_RECEIPT_FLUSH_SECONDS)
+        if not read_receipt_buffer.size():
+            continue
+        try:
+            await run_in_threadpool(_flush_with_new_session)
+        except Exception:
+            logger.exception("Read receipt flush failed, %s receipts kept for retry", read_receipt_buffer.size())
+
+
+async def stop_read_receipt_flusher(task: asyncio.Task[None]) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        logger.exception("Read receipt flusher had stopped with an error")
+    try:
+        await run_in_threadpool(_flush_with_new_session)
+    except Exception:
+        logger.exception("Final read receipt flush failed, %s receipts dropped", read_receipt_buffer.size())
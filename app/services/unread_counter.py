@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.constants import utcnow
+from app.db import upsert
+from app.models import AccessMailboxCounter, AccessMessage, AccessUser
+
+
+def _count_unread(db: Session, clerk_user_id: str) -> int:
+    count = db.scalar(
+        select(func.count())
+        .select_from(AccessMessage)
+        .where(
+            AccessMessage.recipient_clerk_user_id == clerk_user_id,
+            AccessMessage.read_at.is_(None),
+        )
+    )
+    return int(count or 0)
+
+
+def get_unread_count(db: Session, clerk_user_id: str) -> int:
+    count = db.scalar(
+        select(AccessMailboxCounter.unread_count).where(AccessMailboxCounter.clerk_user_id == clerk_user_id)
+    )
+    if count is None:
+        return _count_unread(db, clerk_user_id)
+    return count
+
+
+def get_unread_counts(db: Session, clerk_user_ids: Iterable[str]) -> dict[str, int]:
+    clerk_user_ids = set(clerk_user_ids)
+    if not clerk_user_ids:
+        return {}
+    counts = dict(
+        db.execute(
+            select(AccessMailboxCounter.clerk_user_id, AccessMailboxCounter.unread_count).where(
+                AccessMailboxCounter.clerk_user_id.in_(clerk_user_ids)
+            )
+        ).all()
+    )
+    missing = clerk_user_ids - set(counts)
+    if missing:
+        counts.update({clerk_user_id: 0 for clerk_user_id in missing})
+        counts.update(
+            db.execute(
+                select(AccessMessage.recipient_clerk_user_id, func.count())
+                .where(AccessMessage.recipient_clerk_user_id.in_(missing), AccessMessage.read_at.is_(None))
+                .group_by(AccessMessage.recipient_clerk_user_id)
+            ).all()
+        )
+    return counts
+
+
+def _unread_subquery() -> Any:
+    return (
+        select(func.count())
+        .select_from(AccessMessage)
+        .where(
+            AccessMessage.recipient_clerk_user_id == AccessUser.clerk_user_id,
+            AccessMessage.read_at.is_(None),
+        )
+        .scalar_subquery()
+    )
+
+
+def adjust_unread_count(db: Session, clerk_user_id: str, delta: int) -> None:
+    adjust_unread_counts(db, {clerk_user_id: delta})
+
+
+def adjust_unread_counts(db: Session, deltas: Mapping[str, int]) -> None:
+    deltas = {clerk_user_id: delta for clerk_user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    table = AccessMailboxCounter.__table__
+    timestamp = utcnow()
+
+    by_delta: dict[int, list[str]] = {}
+    for clerk_user_id, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(clerk_user_id)
+    updated: set[str] = set()
+    for delta, clerk_user_ids in by_delta.items():
+        updated.update(
+            db.connection().scalars(
+                update(table)
+                .where(table.c.clerk_user_id.in_(clerk_user_ids))
+                .values(unread_count=table.c.unread_count + delta, updated_at=timestamp)
+                .returning(table.c.clerk_user_id)
+            )
+        )
+
+    missing = {clerk_user_id: delta for clerk_user_id, delta in deltas.items() if clerk_user_id not in updated}
+    if not missing:
+        return
+    # No counter yet: seed it from the messages table, which already reflects the pending change.
+    # A concurrent seed wins the insert; this transaction then only adds its own delta.
+    db.flush()
+    statement = upsert(db, table).from_select(
+        ["clerk_user_id", "unread_count", "updated_at"],
+        select(
+            AccessUser.clerk_user_id,
+            _unread_subquery(),
+            literal(timestamp, type_=table.c.updated_at.type),
+        ).where(AccessUser.clerk_user_id.in_(list(missing))),
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.clerk_user_id],
+            set_={
+                "unread_count": table.c.unread_count + case(missing, value=statement.excluded.clerk_user_id),
+                "updated_at": timestamp,
+            },
+        )
+    )
+
+
+def seed_unread_counters(db: Session, clerk_user_ids: Iterable[str]) -> None:
+    table = AccessMailboxCounter.__table__
+    statement = upsert(db, table).from_select(
+        ["clerk_user_id", "unread_count", "updated_at"],
+        select(
+            AccessUser.clerk_user_id,
+            _unread_subquery(),
+            literal(utcnow(), type_=table.c.updated_at.type),
+        ).where(AccessUser.clerk_user_id.in_(set(clerk_user_ids))),
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.clerk_user_id],
+            set_={"unread_count": statement.excluded.unread_count, "updated_at": statement.excluded.updated_at},
+        )
+    )
+
+
+def drop_unread_counter(db: Session, clerk_user_id: str) -> None:
+    db.execute(delete(AccessMailboxCounter).where(AccessMailboxCounter.clerk_user_id == clerk_user_id))
+
+
+def recount_unread_counters(db: Session, clerk_user_id: Optional[str] = None) -> int:
+    users = select(
+        AccessUser.clerk_user_id,
+        _unread_subquery(),
+        literal(utcnow(), type_=AccessMailboxCounter.updated_at.type),
+    )
+    counters = delete(AccessMailboxCounter)
+    if clerk_user_id is not None:
+        users = users.where(AccessUser.clerk_user_id == clerk_user_id)
+        counters = counters.where(AccessMailboxCounter.clerk_user_id == clerk_user_id)
+
+    db.execute(counters)
+    result = db.execute(
+        insert(AccessMailboxCounter).from_select(
+            ["clerk_user_id", "unread_count", "updated_at"],
+            users,
+        )
+    )
+    db.commit()
+    return int(result.rowcount or 0)
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+
+API_KEY = "bench-access-key"
+ADMIN_ID = "bench_admin"
+ROLES = ("viewer", "editor", "admin")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    router: str
+    method: str
+    build: Callable[[random.Random], tuple[str, Optional[dict[str, Any]], str]]
+
+
+@dataclass
+class Context:
+    user_ids: list[str]
+    pending_ids: list[str]
+    messages: list[tuple[int, str]] = field(default_factory=list)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _get_message(ctx: Context, rng: random.Random) -> tuple[str, None, str]:
+    message_id, recipient = rng.choice(ctx.messages)
+    return f"/messages/{message_id}", None, recipient
+
+
+def _scenarios(ctx: Context) -> list[Scenario]:
+    def user(rng: random.Random) -> str:
+        return rng.choice(ctx.user_ids)
+
+    return [
+        Scenario("health", "system", "GET", lambda rng: ("/health", None, ADMIN_ID)),
+        Scenario("roles", "system", "GET", lambda rng: ("/roles", None, ADMIN_ID)),
+        Scenario(
+            "auth_sync",
+            "auth",
+            "POST",
+            lambda rng: (
+                "/auth/sync",
+                {"clerk_user_id": rng.choice(ctx.pending_ids), "requested_role": rng.choice(ROLES[:2])},
+                ADMIN_ID,
+            ),
+        ),
+        Scenario(
+            "auth_check",
+            "auth",
+            "POST",
+            lambda rng: (
+                "/auth/check",
+                {"actor_clerk_user_id": user(rng), "checks": [{"permission": "dashboard:read"}, {"permission": "period:lock"}]},
+                ADMIN_ID,
+            ),
+        ),
+        Scenario("admin_users", "admin", "GET", lambda rng: ("/admin/users", None, ADMIN_ID)),
+        Scenario("admin_pending", "admin", "GET", lambda rng: ("/admin/users/pending", None, ADMIN_ID)),
+        Scenario("messages_users", "messages", "GET", lambda rng: ("/messages/users", None, user(rng))),
+        Scenario("messages_inbox", "messages", "GET", lambda rng: ("/messages/inbox", None, user(rng))),
+        Scenario("messages_inbox_summary", "messages", "GET", lambda rng: ("/messages/inbox/summary", None, user(rng))),
+        Scenario("messages_sent", "messages", "GET", lambda rng: ("/messages/sent", None, user(rng))),
+        Scenario("messages_unread_count", "messages", "GET", lambda rng: ("/messages/unread-count", None, user(rng))),
+        Scenario(
+            "messages_get",
+            "messages",
+            "GET",
+            lambda rng: _get_message(ctx, rng),
+        ),
+        Scenario(
+            "messages_send",
+            "messages",
+            "POST",
+            lambda rng: (
+                "/messages/send",
+                {"recipient_clerk_user_id": ctx.user_ids[0], "subject": "Bench", "body": "Benchmark message body"},
+                rng.choice(ctx.user_ids[1:]),
+            ),
+        ),
+    ]
+
+
+def _seed(users: int, messages: int, seed: int) -> Context:
+    from sqlalchemy import insert, select
+
+    from app.constants import AccessStatus, utcnow
+    from app.db import SessionLocal
+    from app.models import AccessMessage, AccessUser
+    from app.services.unread_counter import recount_unread_counters
+
+    rng = random.Random(seed)
+    now = utcnow()
+    pending_count = max(1, users // 10)
+    approved_ids = [f"bench_user_{index}" for index in range(users)]
+    pending_ids = [f"bench_pending_{index}" for index in range(pending_count)]
+
+    user_rows = [
+        {
+            "clerk_user_id": ADMIN_ID,
+            "email": "admin@bench.local",
+            "full_name": "Bench Admin",
+            "requested_role": "admin",
+            "approved_role": "admin",
+            "status": AccessStatus.approved.value,
+            "approved_at": now,
+        }
+    ]
+    for clerk_user_id in approved_ids:
+        role = rng.choice(ROLES[:2])
+        user_rows.append(
+            {
+                "clerk_user_id": clerk_user_id,
+                "email": f"{clerk_user_id}@bench.local",
+                "full_name": clerk_user_id.replace("_", " ").title(),
+                "requested_role": role,
+                "approved_role": role,
+                "status": AccessStatus.approved.value,
+                "approved_at": now,
+            }
+        )
+    for clerk_user_id in pending_ids:
+        user_rows.append(
+            {
+                "clerk_user_id": clerk_user_id,
+                "email": f"{clerk_user_id}@bench.local",
+                "full_name": None,
+                "requested_role": rng.choice(ROLES[:2]),
+                "status": AccessStatus.pending.value,
+            }
+        )
+
+    message_rows = []
+    for index in range(messages):
+        created_at = now - timedelta(seconds=messages - index)
+        message_rows.append(
+            {
+                "sender_clerk_user_id": rng.choice(approved_ids),
+                "recipient_clerk_user_id": rng.choice(approved_ids),
+                "subject": f"Message {index}",
+                "body": f"Seeded benchmark message number {index} about topic {rng.randint(0, 50)}",
+                "read_at": created_at if rng.random() < 0.5 else None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+
+    with SessionLocal() as db:
+        db.execute(insert(AccessUser), user_rows)
+        for start in range(0, len(message_rows), 5000):
+            db.execute(insert(AccessMessage), message_rows[start : start + 5000])
+        db.commit()
+        recount_unread_counters(db)
+        sample = db.execute(select(AccessMessage.id, AccessMessage.recipient_clerk_user_id).limit(1000))
+        sampled_messages = [(message_id, recipient) for message_id, recipient in sample]
+
+    return Context(user_ids=approved_ids, pending_ids=pending_ids, messages=sampled_messages)
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_: Any) -> None:
+        self.count += 1
+
+
+async def _run_scenario(
+    client: Any,
+    scenario: Scenario,
+    counter: QueryCounter,
+    requests: int,
+    rounds: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> dict[str, Any]:
+    rng = random.Random(f"{seed}:{scenario.name}")
+
+    async def call() -> tuple[float, int]:
+        path, body, actor = scenario.build(rng)
+        headers = {"x-api-key": API_KEY, "x-actor-clerk-user-id": actor}
+        started = time.perf_counter()
+        response = await client.request(scenario.method, path, json=body, headers=headers)
+        return time.perf_counter() - started, response.status_code
+
+    for _ in range(warmup):
+        await call()
+
+    per_round = max(1, requests // rounds)
+    percentiles: dict[str, list[float]] = {"p50_ms": [], "p95_ms": [], "p99_ms": []}
+    measured = 0
+    errors = 0
+    queries = 0
+    wall = 0.0
+    for _ in range(rounds):
+        latencies: list[float] = []
+        remaining = per_round
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                elapsed, status_code = await call()
+                latencies.append(elapsed)
+                if status_code >= 400:
+                    errors += 1
+
+        counter.count = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall += time.perf_counter() - started
+        queries += counter.count
+        measured += len(latencies)
+        for key, fraction in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            percentiles[key].append(_percentile(latencies, fraction) * 1000)
+
+    # Medians across rounds damp the scheduler and GC noise of a single in-process run.
+    return {
+        "router": scenario.router,
+        "method": scenario.method,
+        "requests": measured,
+        "errors": errors,
+        **{key: round(statistics.median(values), 3) for key, values in percentiles.items()},
+        "throughput_rps": round(measured / wall, 2) if wall else 0.0,
+        "queries_per_request": round(queries / measured, 2) if measured else 0.0,
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    import main
+    from app.db import async_engine, engine
+
+    await main.startup()
+    try:
+        return await _measure(args, main.app, engine, async_engine)
+    finally:
+        await main.shutdown()
+        if async_engine is not None:
+            await async_engine.dispose()
+        engine.dispose()
+
+
+async def _measure(args: argparse.Namespace, app: Any, engine: Any, async_engine: Any) -> dict[str, Any]:
+    import httpx
+    from sqlalchemy import event
+
+    ctx = _seed(args.users, args.messages, args.seed)
+
+    counter = QueryCounter()
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+
+    selected = set(args.only or [])
+    results: dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in _scenarios(ctx):
+            if selected and scenario.name not in selected and scenario.router not in selected:
+                continue
+            results[scenario.name] = await _run_scenario(
+                client, scenario, counter, args.requests, args.rounds, args.concurrency, args.warmup, args.seed
+            )
+
+    for target in engines:
+        event.remove(target, "before_cursor_execute", counter)
+
+    return {
+        "config": {
+            "users": args.users,
+            "messages": args.messages,
+            "requests": args.requests,
+            "rounds": args.rounds,
+            "concurrency": args.concurrency,
+            "async": os.environ.get("ACCESS_DB_ASYNC", "false"),
+            "python": sys.version.split()[0],
+        },
+        "scenarios": results,
+    }
+
+
+def _regressions(report: dict[str, Any], baseline: dict[str, Any], tolerance: float, min_delta_ms: float) -> list[str]:
+    failures = []
+    if baseline.get("config", {}) != report["config"]:
+        print("WARNING baseline was recorded with a different configuration", file=sys.stderr)
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        # Sub-millisecond shifts are noise in-process, so a regression must clear both bounds.
+        allowed = max(previous["p50_ms"] * (1 + tolerance), previous["p50_ms"] + min_delta_ms)
+        if current["p50_ms"] > allowed:
+            failures.append(f"{name}: median p50 {current['p50_ms']}ms > baseline {previous['p50_ms']}ms")
+        if current["queries_per_request"] > previous["queries_per_request"] * (1 + tolerance):
+            failures.append(
+                f"{name}: {current['queries_per_request']} queries/request > baseline {previous['queries_per_request']}"
+            )
+        if current["errors"] > previous["errors"]:
+            failures.append(f"{name}: {current['errors']} errors > baseline {previous['errors']}")
+    return failures
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="In-process benchmark of the access backend")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario, split across rounds")
+    parser.add_argument("--rounds", type=int, default=5, help="Measurement rounds per scenario; percentiles are medians across rounds")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="*", help="Scenario or router names to run")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previously saved report")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative median p50 and queries/request increase over the baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Latency increase always tolerated, in milliseconds")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="access-bench-")
+    os.environ["ACCESS_DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ.pop("ACCESS_ASYNC_DATABASE_URL", None)
+    os.environ["ACCESS_BACKEND_API_KEY"] = API_KEY
+    os.environ["ACCESS_AUTO_MIGRATE"] = "true"
+
+    try:
+        report = asyncio.run(_run(args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    payload = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(payload + "\n")
+    print(payload)
+
+    if args.baseline is not None:
+        failures = _regressions(report, json.loads(args.baseline.read_text()), args.tolerance, args.min_delta_ms)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
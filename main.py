@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import (
     ACCESS_ALLOWED_ORIGINS,
     ACCESS_ALLOWED_ORIGIN_REGEX,
+    ACCESS_AUTO_MIGRATE,
     ACCESS_CORS_ALLOW_CREDENTIALS,
+    ACCESS_DELETION_WORKER_ENABLED,
+    ACCESS_METRICS_ENABLED,
+    ACCESS_PROFILING_ENABLED,
 )
-from app.db import Base, engine
+from app.db import async_engine, engine, sync_engines
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.migrations import check_schema_version, migrate
+from app.profiling import ProfilingMiddleware, profile_engine
 from app.routers import admin, auth, messages, system
+from app.services.deletion_jobs import run_deletion_worker, stop_deletion_worker
+from app.services.read_receipts import read_receipt_buffer, run_read_receipt_flusher, stop_read_receipt_flusher
 
 
 allow_credentials = ACCESS_CORS_ALLOW_CREDENTIALS and "*" not in ACCESS_ALLOWED_ORIGINS
@@ -23,11 +36,40 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if ACCESS_METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    for sync_engine in sync_engines():
+        instrument_engine(sync_engine)
+if ACCESS_PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    for sync_engine in sync_engines():
+        profile_engine(sync_engine)
+
+
+_background_tasks: list[tuple[asyncio.Task[None], Callable[[asyncio.Task[None]], Awaitable[None]]]] = []
 
 
 @app.on_event("startup")
-def startup() -> None:
-    Base.metadata.create_all(bind=engine)
+async def startup() -> None:
+    if ACCESS_AUTO_MIGRATE:
+        await run_in_threadpool(migrate, engine)
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            await connection.run_sync(check_schema_version)
+    else:
+        with engine.connect() as connection:
+            check_schema_version(connection)
+    if read_receipt_buffer.enabled:
+        _background_tasks.append((asyncio.create_task(run_read_receipt_flusher()), stop_read_receipt_flusher))
+    if ACCESS_DELETION_WORKER_ENABLED:
+        _background_tasks.append((asyncio.create_task(run_deletion_worker()), stop_deletion_worker))
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    while _background_tasks:
+        task, stop = _background_tasks.pop()
+        await stop(task)
 
 
 app.include_router(system.router)